@@ -11,7 +11,13 @@ and air.
 
 import numpy as np
 import unyt as u
-from tqdm import tqdm, trange
+from tqdm import tqdm
+
+# The temperature (°C) and pressure (mmHg) the Edlen 1953 formula is used at,
+# and the scalar factor they contribute to the index of refraction.
+_T, _P = 15., 760.
+_TP_FACTOR = 1e-6 * _P * (1 + (1.049-0.0157*_T)*1e-6*_P) / 720.883 /\
+    (1 + 0.003661*_T)
 
 
 def air_indexEdlen53(l, t=15., p=760.):
@@ -23,8 +29,8 @@ def air_indexEdlen53(l, t=15., p=760.):
 
     Parameters
     ----------
-    l : float
-        Vacuum wavelength in Angstroms
+    l : float or array-like
+        Vacuum wavelength(s) in Angstroms
     t : float
         Temperature in °C. (Don't actually change this from the default!)
     p : float
@@ -32,14 +38,45 @@ def air_indexEdlen53(l, t=15., p=760.):
 
     Returns
     -------
-    float
+    float or `numpy.ndarray`
         The index of refraction for air at the given parameters.
 
     """
 
-    n = 1e-6 * p * (1 + (1.049-0.0157*t)*1e-6*p) / 720.883 / (1 + 0.003661*t)\
-        * (64.328 + 29498.1/(146-(1e4/l)**2) + 255.4/(41-(1e4/l)**2))
-    n = n + 1
+    l = np.asarray(l, dtype=np.float64)
+    # The temperature and pressure factor is a scalar, so compute it before
+    # it touches the array, and only compute the squared wavenumber once.
+    tp_factor = 1e-6 * p * (1 + (1.049-0.0157*t)*1e-6*p) / 720.883 /\
+        (1 + 0.003661*t)
+    s2 = (1e4 / l) ** 2
+    n = tp_factor * (64.328 + 29498.1/(146-s2) + 255.4/(41-s2))
+    n += 1
+    return n
+
+
+def air_indexEdlen53_std(l):
+    """Return the index of refraction of air at the standard temperature and
+    pressure used by ESO, for wavelength(s) in Angstroms.
+
+    This is the same as `air_indexEdlen53` with its default parameters, but
+    with the temperature and pressure factor computed once at import.
+
+    Parameters
+    ----------
+    l : float or array-like
+        Vacuum wavelength(s) in Angstroms
+
+    Returns
+    -------
+    float or `numpy.ndarray`
+        The index of refraction for air at the given wavelength(s).
+
+    """
+
+    l = np.asarray(l, dtype=np.float64)
+    s2 = (1e4 / l) ** 2
+    n = _TP_FACTOR * (64.328 + 29498.1/(146-s2) + 255.4/(41-s2))
+    n += 1
     return n
 
 
@@ -59,19 +96,24 @@ def vac2airESO(ll):
     Returns
     -------
     float or `unyt.unyt_quantity`
-        The wavelength in air.
+        The wavelength in air, in the original units if given with units.
 
     """
 
     if isinstance(ll, (u.array.unyt_quantity, u.array.unyt_array)):
         original_units = ll.units
-        ll.convert_to_units(u.angstrom)
-        ll = ll.value
-    elif isinstance(ll, (float, np.ndarray)):
-        original_units = 1
+        if original_units == u.angstrom:
+            ll = ll.value
+        else:
+            ll = ll.to_value(u.angstrom)
+    else:
+        ll = np.asarray(ll, dtype=np.float64)
+        original_units = None
 
-    llair = ll/air_indexEdlen53(ll)
-    return llair * original_units
+    llair = ll/air_indexEdlen53_std(ll)
+    if original_units is None:
+        return llair
+    return (llair * u.angstrom).to(original_units)
 
 
 def air2vacESO(air_wavelengths_array, verbose=False):
@@ -80,9 +122,10 @@ def air2vacESO(air_wavelengths_array, verbose=False):
 
     Parameters
     ----------
-    air_arr : `unyt.unyt_array`
+    air_arr : `unyt.unyt_array` or `numpy.ndarray`
         A list of wavelengths in air, with dimensions length. Will be converted
-        to Angstroms internally.
+        to Angstroms internally. If given without units, it needs to be in
+        Angstroms.
 
 
     Optional
@@ -92,51 +135,59 @@ def air2vacESO(air_wavelengths_array, verbose=False):
 
     Returns
     -------
-    `unyt.unyt_array`
-        A unyt_array of wavelengths in vacuum, in the original units.
+    `unyt.unyt_array` or `numpy.ndarray`
+        A unyt_array of wavelengths in vacuum, in the original units, or a
+        plain array in Angstroms if the input had no units.
 
     """
 
-    reshape = False
-    original_units = air_wavelengths_array.units
-    if air_wavelengths_array.ndim == 2:
-        # We need to flatten the array to 1-D, then reshape it afterwards.
-        reshape = True
-        original_shape = air_wavelengths_array.shape
-        air_wavelengths_array = air_wavelengths_array.flatten()
+    if isinstance(air_wavelengths_array, u.unyt_array):
+        original_units = air_wavelengths_array.units
+        air_wavelengths = np.asarray(
+            air_wavelengths_array.to_value(u.angstrom), dtype=np.float64)
+    else:
+        original_units = None
+        air_wavelengths = np.asarray(air_wavelengths_array, dtype=np.float64)
 
-    air_wavelengths_array.convert_to_units(u.angstrom)
+    if verbose:
+        tqdm.write('Converting air wavelengths to vacuum using Edlen 1953.')
 
     tolerance = 2e-12
     num_iter = 100
 
-    vacuum_wavelengths_list = []
+    # Iterate on all the wavelengths at once until every one has converged,
+    # checking convergence with a single (NaN-ignoring) max-norm reduction
+    # over the whole array per iteration. Since the index of refraction
+    # changes very little over the range of the difference between air and
+    # vacuum wavelengths this only takes a few iterations. Starting from the
+    # Morton (2000) IAU conversion, which agrees with Edlen 1953 to ~1e-4
+    # Angstroms in the optical, saves one of the four iterations needed when
+    # starting from the air wavelengths.
+    new_wavelengths = air2vacMortonIAU(air_wavelengths)
+    for iterations in range(1, num_iter + 1):
+        old_wavelengths = new_wavelengths
+        new_wavelengths = air_wavelengths *\
+            air_indexEdlen53_std(old_wavelengths)
+        max_change = np.fmax.reduce(np.abs(new_wavelengths - old_wavelengths),
+                                    axis=None, initial=0.)
+        if max_change <= tolerance:
+            break
+    else:
+        raise RuntimeError('Max number of iterations exceeded!')
 
     if verbose:
-        tqdm.write('Converting air wavelengths to vacuum using Edlen 1953.')
-    for i in trange(0, len(air_wavelengths_array)):
-        new_wavelength = air_wavelengths_array[i].value
-        old_wavelength = 0.
-        iterations = 0
-        past_iterations = [new_wavelength]
-        while abs(old_wavelength - new_wavelength) > tolerance:
-            old_wavelength = new_wavelength
-            n_refraction = air_indexEdlen53(new_wavelength)
-            new_wavelength = air_wavelengths_array[i].value * n_refraction
-            iterations += 1
-            past_iterations.append(new_wavelength)
-            if iterations > num_iter:
-                print(past_iterations)
-                raise RuntimeError('Max number of iterations exceeded!')
-
-        vacuum_wavelengths_list.append(new_wavelength)
-    vacuum_array = u.unyt_array(vacuum_wavelengths_list, u.angstrom)
-
-    if reshape:
-        # Reshape the array back to its original shape.
-        return vacuum_array.reshape(original_shape).to(original_units)
-    else:
-        return vacuum_array.to(original_units)
+        tqdm.write(f'Converged after {iterations} iterations.')
+
+    new_wavelengths = np.asarray(new_wavelengths)
+    if new_wavelengths.ndim == 0:
+        new_wavelengths = new_wavelengths[()]
+
+    if original_units is None:
+        return new_wavelengths
+
+    vacuum_array = u.unyt_array(new_wavelengths, u.angstrom)
+
+    return vacuum_array.to(original_units)
 
 
 def vac2airMorton00(wl_vac):
@@ -146,10 +197,25 @@ def vac2airMorton00(wl_vac):
     Formula taken from
     https://www.astro.uu.se/valdwiki/Air-to-vacuum%20conversion
     from Morton (2000, ApJ. Suppl., 130, 403) (IAU standard)
+
+    Can be given a single wavelength or an array of them, which will all be
+    converted at once, so there's no need to call it in a loop.
+
+    Parameters
+    ----------
+    wl_vac : float or array-like
+        Vacuum wavelength(s) in Angstroms.
+
+    Returns
+    -------
+    float or `numpy.ndarray`
+        The air wavelength(s) in Angstroms, with the same shape as the input.
+
     """
-    s = 1e4 / wl_vac
-    n = 1 + 0.0000834254 + (0.02406147 / (130 - s**2)) +\
-        (0.00015998 / (38.9 - s**2))
+    wl_vac = np.asarray(wl_vac, dtype=np.float64)
+    s2 = (1e4 / wl_vac) ** 2
+    n = 1 + 0.0000834254 + (0.02406147 / (130 - s2)) +\
+        (0.00015998 / (38.9 - s2))
     return wl_vac / n
 
 
@@ -159,8 +225,24 @@ def air2vacMortonIAU(wl_air):
 
     Formula taken from
     https://www.astro.uu.se/valdwiki/Air-to-vacuum%20conversion
+
+    Can be given a single wavelength or an array of them, which will all be
+    converted at once, so there's no need to call it in a loop.
+
+    Parameters
+    ----------
+    wl_air : float or array-like
+        Air wavelength(s) in Angstroms.
+
+    Returns
+    -------
+    float or `numpy.ndarray`
+        The vacuum wavelength(s) in Angstroms, with the same shape as the
+        input.
+
     """
-    s = 1e4 / wl_air
-    n = 1 + 0.00008336624212083 + (0.02408926869968 / (130.1065924522 - s**2))\
-        + (0.0001599740894897 / (38.92568793293 - s**2))
+    wl_air = np.asarray(wl_air, dtype=np.float64)
+    s2 = (1e4 / wl_air) ** 2
+    n = 1 + 0.00008336624212083 + (0.02408926869968 / (130.1065924522 - s2))\
+        + (0.0001599740894897 / (38.92568793293 - s2))
     return wl_air * n
@@ -13,7 +13,8 @@ import pytest
 
 import unyt as u
 
-from varconlib.conversions import (air_indexEdlen53, vac2airESO, air2vacESO,
+from varconlib.conversions import (air_indexEdlen53, air_indexEdlen53_std,
+                                   vac2airESO, air2vacESO,
                                    vac2airMorton00, air2vacMortonIAU)
 
 
@@ -43,6 +44,10 @@ class TestEdlen1953(object):
     def testAirIndex(self):
         assert air_indexEdlen53(5000) == pytest.approx(1.0002789636500335)
 
+    def testStandardAirIndex(self, vacuum_array):
+        assert air_indexEdlen53_std(vacuum_array.value) ==\
+            pytest.approx(air_indexEdlen53(vacuum_array.value), rel=1e-15)
+
     def testAirUnits(self, vacuum_array):
         assert vac2airESO(vacuum_array).units == u.angstrom
 
@@ -64,6 +69,42 @@ class TestEdlen1953(object):
                                                             5001.60477364,
                                                             5002.60450793])
 
+    def testVac2AirLeavesInputUnchanged(self, vacuum_array):
+        nm_array = vacuum_array.to(u.nm)
+        air_wavelengths = vac2airESO(nm_array)
+        assert nm_array.units == u.nm
+        assert nm_array.value == pytest.approx(vacuum_array.value / 10)
+        assert air_wavelengths.units == u.nm
+        assert air_wavelengths.to(u.angstrom).value ==\
+            pytest.approx(vac2airESO(vacuum_array.value))
+
+    def testAir2VacNoUnits(self, air_array):
+        vacuum_wavelengths = air2vacESO(air_array.value)
+        assert not isinstance(vacuum_wavelengths, u.unyt_array)
+        assert vacuum_wavelengths == pytest.approx(air2vacESO(
+            air_array.copy()).value)
+
+    def testAir2VacScalar(self):
+        vacuum_wavelength = air2vacESO(5000 * u.angstrom)
+        assert vacuum_wavelength.shape == ()
+        assert vacuum_wavelength.units == u.angstrom
+        assert air2vacESO(500 * u.nm).to(u.angstrom).value ==\
+            pytest.approx(vacuum_wavelength.value)
+        assert air2vacESO(5000.) == pytest.approx(vacuum_wavelength.value)
+
+    def testAir2VacLeavesInputUnchanged(self, air_array):
+        nm_array = air_array.to(u.nm)
+        air2vacESO(nm_array)
+        assert nm_array.units == u.nm
+        assert nm_array.value == pytest.approx(air_array.value / 10)
+
+    def testAir2VacRepeatedConversion(self, air_array):
+        first = air2vacESO(air_array.value)
+        first[0] = 0
+        second = air2vacESO(air_array.value)
+        assert second[0] == pytest.approx(3801.078891)
+        assert second.flags.writeable
+
 
 class TestMorton2000(object):
 
@@ -74,9 +115,25 @@ class TestMorton2000(object):
                                                                  5001.604724,
                                                                  5002.604459])
 
+    def testListInput(self, unitless_array):
+        assert vac2airMorton00(list(unitless_array)) ==\
+            pytest.approx(vac2airMorton00(unitless_array))
+        assert air2vacMortonIAU(list(unitless_array)) ==\
+            pytest.approx(air2vacMortonIAU(unitless_array))
+
     def testAir2Vac(self, unitless_array):
         assert air2vacMortonIAU(unitless_array) == pytest.approx([5001.394848,
                                                                   5002.395114,
                                                                   5003.395380,
                                                                   5004.395646,
                                                                   5005.395911])
+
+    def testArrayInput(self, unitless_array):
+        assert vac2airMorton00(unitless_array.reshape(5, 1)).shape == (5, 1)
+        assert air2vacMortonIAU(unitless_array)[2] ==\
+            pytest.approx(air2vacMortonIAU(unitless_array[2]))
+
+    def testRoundTrip(self):
+        wavelengths = np.linspace(3800, 6900, 10000)
+        assert air2vacMortonIAU(vac2airMorton00(wavelengths)) ==\
+            pytest.approx(wavelengths, rel=0, abs=1e-8)
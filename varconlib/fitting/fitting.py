@@ -214,6 +214,101 @@ def cubic_model(data, a, b, c, d, e, f, g, h, i, j):
         h * data[0] ** 3 + i * data[1] ** 3 + j * data[2] ** 3
 
 
+def linear_model_jac(data, *params):
+    """
+    Return the Jacobian of `linear_model` with respect to its coefficients.
+
+    Parameters
+    ----------
+    data : array-like with dimensions (3, n)
+        The independent variable, as for `linear_model`.
+    params : float or int
+        The coefficients of the model. They are accepted to match the call
+        signature expected by `scipy.optimize.curve_fit`, but since the model
+        is linear in its coefficients the Jacobian does not depend on them.
+
+    Returns
+    -------
+    `numpy.ndarray` with dimensions (n, 4)
+        The partial derivatives of the model with respect to each coefficient,
+        one column per coefficient.
+
+    """
+
+    return np.stack((np.ones_like(data[0]), data[0], data[1], data[2]),
+                    axis=1)
+
+
+def quadratic_model_jac(data, *params):
+    """
+    Return the Jacobian of `quadratic_model` with respect to its coefficients.
+
+    Parameters
+    ----------
+    data : array-like with dimensions (3, n)
+        The independent variable, as for `quadratic_model`.
+    params : float or int
+        The coefficients of the model (unused, see `linear_model_jac`).
+
+    Returns
+    -------
+    `numpy.ndarray` with dimensions (n, 7)
+        The partial derivatives of the model with respect to each coefficient,
+        one column per coefficient.
+
+    """
+
+    return np.stack((np.ones_like(data[0]), data[0], data[1], data[2],
+                     data[0] ** 2, data[1] ** 2, data[2] ** 2), axis=1)
+
+
+def cross_term_model_jac(data, *params):
+    """
+    Return the Jacobian of `cross_term_model` with respect to its coefficients.
+
+    Parameters
+    ----------
+    data : array-like with dimensions (3, n)
+        The independent variable, as for `cross_term_model`.
+    params : float or int
+        The coefficients of the model (unused, see `linear_model_jac`).
+
+    Returns
+    -------
+    `numpy.ndarray` with dimensions (n, 5)
+        The partial derivatives of the model with respect to each coefficient,
+        one column per coefficient.
+
+    """
+
+    return np.stack((np.ones_like(data[0]), data[0], data[1], data[2],
+                     data[1] / data[0]), axis=1)
+
+
+def quadratic_mag_model_jac(data, *params):
+    """
+    Return the Jacobian of `quadratic_mag_model` with respect to its
+    coefficients.
+
+    Parameters
+    ----------
+    data : array-like with dimensions (3, n)
+        The independent variable, as for `quadratic_mag_model`.
+    params : float or int
+        The coefficients of the model (unused, see `linear_model_jac`).
+
+    Returns
+    -------
+    `numpy.ndarray` with dimensions (n, 6)
+        The partial derivatives of the model with respect to each coefficient,
+        one column per coefficient.
+
+    """
+
+    return np.stack((np.ones_like(data[0]), data[0], data[1], data[2],
+                     data[1] / data[0], data[2] ** 2), axis=1)
+
+
 def gaussian(x, a, b, c, d=0):
     r"""Return the value of a Gaussian function with the given parameters.
 
@@ -499,6 +594,142 @@ def calc_chi_squared_nu(residuals, errors, n_params):
         return chi_squared / dof
 
 
+def find_sigma_sys(residuals, errors, n_params, step=0.01):
+    """Find the systematic error needed to bring chi-squared_nu down to 1.
+
+    The systematic error is added in quadrature to `errors`, and for each
+    value tried the residuals are re-centered on their weighted mean. Since
+    the reduced chi-squared value can only decrease as the systematic error
+    increases, a bisection search over multiples of `step` is used to find the
+    smallest one which gives a value of 1 or less.
+
+    Parameters
+    ----------
+    residuals : array-like of floats
+        An array of residuals from a fitted model.
+    errors : array-like of floats
+        An array of the errors on each value in `residuals`.
+    n_params : int
+        The number of fitted parameters to use when finding the degrees of
+        freedom.
+
+    Optional
+    --------
+    step : float, Default : 0.01
+        The resolution with which to find the systematic error.
+
+    Returns
+    -------
+    float
+        The smallest multiple of `step` which, added in quadrature to `errors`,
+        gives a reduced chi-squared value of 1 or less. If the value is already
+        1 or less (or undefined) with no additional error, 0 is returned.
+
+    """
+
+    variances = np.square(errors)
+
+    def chi_squared_nu(num_steps):
+        variances_iter = variances + np.square(num_steps * step)
+        wmean = np.average(residuals, weights=1 / variances_iter)
+        return calc_chi_squared_nu(residuals - wmean, np.sqrt(variances_iter),
+                                   n_params)
+
+    if not chi_squared_nu(0) > 1:
+        return 0.
+
+    # Keep doubling the upper bound until it's large enough, then bisect
+    # between the bounds, keeping chi^2_nu > 1 at the lower bound and <= 1 at
+    # the upper one.
+    lower, upper = 0, 1
+    while chi_squared_nu(upper) > 1:
+        lower, upper = upper, upper * 2
+    while upper - lower > 1:
+        middle = (lower + upper) // 2
+        if chi_squared_nu(middle) > 1:
+            lower = middle
+        else:
+            upper = middle
+
+    return upper * step
+
+
+def find_binned_sigma_sys(residuals, errors, bin_numbers, n_bins, n_params,
+                          step=0.01):
+    """Find the systematic error needed in each of several bins of data.
+
+    This gives the same results as calling `find_sigma_sys` on the data in
+    each bin separately, but runs the bisection searches for all the bins at
+    once.
+
+    Parameters
+    ----------
+    residuals : array-like of floats
+        An array of residuals from a fitted model.
+    errors : array-like of floats
+        An array of the errors on each value in `residuals`.
+    bin_numbers : array-like of ints
+        The number of the bin each value in `residuals` belongs to, from 0 to
+        `n_bins` - 1.
+    n_bins : int
+        The total number of bins.
+    n_params : int
+        The number of fitted parameters to use when finding the degrees of
+        freedom in each bin.
+
+    Optional
+    --------
+    step : float, Default : 0.01
+        The resolution with which to find the systematic error.
+
+    Returns
+    -------
+    `np.ndarray`
+        An array of length `n_bins` with the smallest multiple of `step` for
+        each bin which, added in quadrature to the errors in that bin, gives a
+        reduced chi-squared value of 1 or less. It is 0 for bins where the
+        value is already 1 or less (or undefined) with no additional error.
+
+    """
+
+    residuals = np.asarray(residuals, dtype=float)
+    bin_numbers = np.asarray(bin_numbers)
+    variances = np.square(errors)
+    dof = np.bincount(bin_numbers, minlength=n_bins) - n_params
+
+    def chi_squared_nu(num_steps):
+        variances_iter = variances + np.square(num_steps[bin_numbers] * step)
+        weights = 1 / variances_iter
+        with np.errstate(invalid='ignore', divide='ignore'):
+            wmeans = np.bincount(bin_numbers, weights * residuals, n_bins) /\
+                np.bincount(bin_numbers, weights, n_bins)
+            chi_squared = np.bincount(bin_numbers, np.square(
+                (residuals - wmeans[bin_numbers]) / np.sqrt(variances_iter)),
+                                      n_bins)
+            return np.where(dof > 0, chi_squared / dof, np.nan)
+
+    lower = np.zeros(n_bins, dtype=int)
+    upper = np.ones(n_bins, dtype=int)
+    needed = chi_squared_nu(lower) > 1
+
+    # As in find_sigma_sys, double the upper bounds until they're large
+    # enough, then bisect, for every bin which needs additional error.
+    growing = needed & (chi_squared_nu(upper) > 1)
+    while growing.any():
+        lower[growing] = upper[growing]
+        upper[growing] *= 2
+        growing &= chi_squared_nu(upper) > 1
+    searching = needed & (upper - lower > 1)
+    while searching.any():
+        middle = (lower + upper) // 2
+        above = chi_squared_nu(middle) > 1
+        lower = np.where(searching & above, middle, lower)
+        upper = np.where(searching & ~above, middle, upper)
+        searching = needed & (upper - lower > 1)
+
+    return np.where(needed, upper * step, 0.)
+
+
 def find_sys_scatter(model_func, x_data, y_data, err_array, beta0,
                      n_sigma=2.5, tolerance=0.001, verbose=False):
     """Find the systematic scatter in a dataset with a given model.
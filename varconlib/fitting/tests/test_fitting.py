@@ -90,3 +90,78 @@ class TestIntegratedGaussian(object):
 
     def testStandardDeviation(self, generated_integrated_gaussian):
         assert pytest.approx(np.std(generated_integrated_gaussian), 10)
+
+
+class TestFindSigmaSys(object):
+
+    @pytest.fixture(scope='class')
+    def scattered_data(self):
+        rng = np.random.default_rng(42)
+        errors = rng.uniform(1, 3, 50)
+        residuals = rng.normal(0, 5, 50)
+        return residuals, errors
+
+    def testNoExtraErrorNeeded(self):
+        residuals = np.array([0.5, -0.5, 0.2, -0.2, 0.])
+        errors = np.ones(5)
+        assert fit.find_sigma_sys(residuals, errors, 1) == 0
+
+    def testSmallestStepReachingOne(self, scattered_data):
+        residuals, errors = scattered_data
+
+        def chi_squared_nu(sigma_sys):
+            iter_errors = np.sqrt(np.square(errors) + np.square(sigma_sys))
+            wmean = np.average(residuals, weights=iter_errors ** -2)
+            return fit.calc_chi_squared_nu(residuals - wmean, iter_errors, 1)
+
+        sigma_sys = fit.find_sigma_sys(residuals, errors, 1, step=0.01)
+        assert sigma_sys > 0
+        assert chi_squared_nu(sigma_sys) <= 1
+        assert chi_squared_nu(sigma_sys - 0.01) > 1
+
+
+class TestFindBinnedSigmaSys(object):
+
+    def testMatchesPerBinSearch(self):
+        rng = np.random.default_rng(3)
+        bin_sizes = (30, 12, 5, 1, 0, 20)
+        bin_numbers = np.repeat(np.arange(len(bin_sizes)), bin_sizes)
+        errors = rng.uniform(1, 3, len(bin_numbers))
+        # Give each bin a different amount of extra scatter, and none at all
+        # to the last one.
+        scales = np.array((8, 3, 6, 4, 5, 0.1))[bin_numbers]
+        residuals = rng.normal(0, 1, len(bin_numbers)) * scales
+
+        sigma_sys = fit.find_binned_sigma_sys(residuals, errors, bin_numbers,
+                                              len(bin_sizes), 1, step=0.01)
+        expected = [fit.find_sigma_sys(residuals[bin_numbers == i],
+                                       errors[bin_numbers == i], 1,
+                                       step=0.01) if size else 0.
+                    for i, size in enumerate(bin_sizes)]
+        assert sigma_sys == pytest.approx(expected)
+        assert sigma_sys[-1] == 0
+
+
+class TestModelJacobians(object):
+
+    @pytest.fixture(scope='class')
+    def stellar_params(self):
+        rng = np.random.default_rng(7)
+        return np.stack((rng.uniform(5400, 6200, 20),
+                         rng.uniform(-0.7, 0.4, 20),
+                         rng.uniform(4.1, 4.6, 20)), axis=0)
+
+    @pytest.mark.parametrize('model_func,model_jac', [
+        (fit.linear_model, fit.linear_model_jac),
+        (fit.quadratic_model, fit.quadratic_model_jac),
+        (fit.cross_term_model, fit.cross_term_model_jac),
+        (fit.quadratic_mag_model, fit.quadratic_mag_model_jac)])
+    def testMatchesModelColumns(self, stellar_params, model_func, model_jac):
+        n_params = model_func.__code__.co_argcount - 1
+        params = np.arange(1, n_params + 1, dtype=float)
+        jac = model_jac(stellar_params, *params)
+        assert jac.shape == (stellar_params.shape[1], n_params)
+        # Each model is linear in its coefficients, so the model value is
+        # exactly the Jacobian times the coefficients.
+        assert jac @ params == pytest.approx(model_func(stellar_params,
+                                                        *params))
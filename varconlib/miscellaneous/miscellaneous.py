@@ -10,13 +10,16 @@ across multiple scripts, but which don't really have any commonality.
 """
 
 
+import bisect
 import configparser
 import datetime as dt
+from functools import lru_cache
 from pathlib import Path
 
 from bidict import bidict
 import h5py
 import hickle
+import numpy as np
 from numpy import logical_not, isnan, average, sqrt
 import unyt as u
 from unyt import accepts, returns
@@ -33,6 +36,10 @@ config = configparser.ConfigParser(interpolation=configparser.
                                    ExtendedInterpolation())
 config.read(config_file)
 
+# The speed of light in m/s as a plain float, for use in calculations done on
+# values stripped of their units.
+_C_MS = float(u.c.to_value(u.m / u.s))
+
 # Spectral format files for HARPS blue and red CCDs.
 blueCCDpath = vcl.data_dir / 'HARPS_CCD_blue.csv'
 redCCDpath = vcl.data_dir / 'HARPS_CCD_red.csv'
@@ -53,6 +60,19 @@ order_numbers = bidict({1: 161, 2: 160, 3: 159, 4: 158, 5: 157, 6: 156,
                         65: 96, 66: 95, 67: 94, 68: 93, 69: 92, 70: 91,
                         71: 90, 72: 89})
 
+# Lookup arrays for translating between the two numbering systems by indexing
+# instead of going through the bidict, which also work on whole arrays of
+# order numbers. Entries which don't correspond to an order (including index 0
+# of both) are -1.
+_ordinal_to_order_array = np.full(max(order_numbers.keys()) + 1, -1,
+                                  dtype=np.int16)
+_ordinal_to_order_array[list(order_numbers.keys())] =\
+    list(order_numbers.values())
+_order_to_ordinal_array = np.full(max(order_numbers.values()) + 1, -1,
+                                  dtype=np.int16)
+_order_to_ordinal_array[list(order_numbers.values())] =\
+    list(order_numbers.keys())
+
 
 # Functions
 
@@ -90,27 +110,31 @@ def wavelength2index(wavelength, wavelength_array, reverse=False):
     # For cases where the wavelength is given in descending wavelength order,
     # we can flip it.
     if reverse:
-        wavelength_array.reverse()
+        wavelength_array = wavelength_array[::-1]
+
+    # Compare plain floats in the units of the given wavelength rather than
+    # unyt quantities.
+    if not isinstance(wavelength_array, u.unyt_array):
+        wavelength_array = u.unyt_array(wavelength_array)
+    wavelength_values = wavelength_array.to_value(wavelength.units)
+    wavelength_value = float(wavelength.value)
 
     # If the given wavelength is not within the limits of the array, raise an
     # error.
-    if not wavelength_array[0] < wavelength < wavelength_array[-1]:
+    if not wavelength_values[0] < wavelength_value < wavelength_values[-1]:
         raise RuntimeError("Couldn't find the given wavelength: {}".
                            format(wavelength))
 
-    for i in range(0, len(wavelength_array), 1):
-        # First find the index for which the value is greater than the given
-        # wavelength:
-        if wavelength_array[i] >= wavelength:
-            # Then check if it's closest to this index or the previous one.
-            # The way it's set up it should always be
-            # wl_arr[i-1] <= wl <= wl_arr[i] assuming monotonic increase of
-            # wavelengths.
-            if abs(wavelength_array[i] - wavelength) >\
-               abs(wavelength - wavelength_array[i - 1]):
-                return i - 1
-            else:
-                return i
+    # First find the index for which the value is greater than or equal to the
+    # given wavelength, then check if it's closest to this index or the
+    # previous one. Assuming a monotonic increase of wavelengths it should
+    # always be wl_arr[i-1] < wl <= wl_arr[i].
+    i = int(np.searchsorted(wavelength_values, wavelength_value, side='left'))
+    if abs(wavelength_values[i] - wavelength_value) >\
+       abs(wavelength_value - wavelength_values[i - 1]):
+        return i - 1
+    else:
+        return i
 
 
 def date2index(given_date, date_list):
@@ -152,9 +176,81 @@ def date2index(given_date, date_list):
     elif (date_to_find >= date_list[-1]):
         return None
 
-    for i in range(0, len(date_list), 1):
-        if date_to_find < date_list[i]:
-            return i
+    # Since the dates are in chronological order, a binary search finds the
+    # first one later than the given date.
+    return bisect.bisect_right(date_list, date_to_find)
+
+
+def _translate_order_numbers(lookup_array, numbers):
+    """Translate order numbers using one of the order number lookup arrays.
+
+    Parameters
+    ----------
+    lookup_array : `numpy.ndarray`
+        Either `_ordinal_to_order_array` or `_order_to_ordinal_array`.
+    numbers : int or array-like of ints
+        The order number(s) to translate.
+
+    Returns
+    -------
+    int or `numpy.ndarray`
+        The translated order number(s), as an int if a single number was
+        given.
+
+    """
+
+    numbers = np.asarray(numbers)
+    in_range = (numbers >= 0) & (numbers < len(lookup_array))
+    # Index 0 of both lookup arrays is -1, so out-of-range numbers come out
+    # as invalid along with the missing ones.
+    translated = lookup_array[np.where(in_range, numbers, 0)]
+    if np.any(translated < 0):
+        raise KeyError(f'Invalid order number(s): {numbers[translated < 0]}')
+
+    if translated.ndim == 0:
+        return int(translated)
+    return translated
+
+
+def ordinal_to_order(ordinal):
+    """Return the HARPS spectral order number(s) for given ordinal number(s).
+
+    This is equivalent to `order_numbers[ordinal]`, but also works on arrays.
+
+    Parameters
+    ----------
+    ordinal : int or array-like of ints
+        The ordinal order number(s), from 1 to 72.
+
+    Returns
+    -------
+    int or `numpy.ndarray`
+        The spectral order number(s) (161 to 89).
+
+    """
+
+    return _translate_order_numbers(_ordinal_to_order_array, ordinal)
+
+
+def order_to_ordinal(order):
+    """Return the ordinal number(s) for given HARPS spectral order number(s).
+
+    This is equivalent to `order_numbers.inverse[order]`, but also works on
+    arrays.
+
+    Parameters
+    ----------
+    order : int or array-like of ints
+        The spectral order number(s), from 161 to 89.
+
+    Returns
+    -------
+    int or `numpy.ndarray`
+        The ordinal order number(s) (1 to 72).
+
+    """
+
+    return _translate_order_numbers(_order_to_ordinal_array, order)
 
 
 def calc_blended_centroid_shift(velocity_separation, intensity1, intensity2):
@@ -227,15 +323,18 @@ def shift_wavelength(wavelength, shift_velocity):
     """
 
     original_units = wavelength.units
+    velocity = np.asarray(shift_velocity.to_value(u.m / u.s))
 
     # Make sure we're not using unphysical velocities!
     # But mask out NaNs first because they don't compare.
-    assert (abs(shift_velocity[~isnan(shift_velocity)]) < u.c).all(),\
+    assert (abs(velocity[~isnan(velocity)]) < _C_MS).all(),\
         'Given velocity exceeds speed of light!'
 
-    result = ((shift_velocity / u.c) * wavelength) + wavelength
+    # Work on plain values in the original units to avoid unyt's unit
+    # handling on every operation.
+    result = wavelength.value * (1 + velocity / _C_MS)
 
-    return result.to(original_units)
+    return result * original_units
 
 
 @returns(length)
@@ -269,9 +368,10 @@ def velocity2wavelength(velocity_offset, wavelength, unit=None):
     """
 
     original_units = wavelength.units
-    result = (velocity_offset * wavelength) / u.c
+    result = velocity_offset.to_value(u.m / u.s) * wavelength.value /\
+        _C_MS * original_units
     if not unit:
-        return result.to(original_units)
+        return result
     else:
         return result.to(unit)
 
@@ -297,9 +397,12 @@ def wavelength2velocity(wavelength1, wavelength2):
 
     """
 
-    result = (wavelength2 - wavelength1) * u.c /\
-             ((wavelength1 + wavelength2) / 2)
-    return result.to(u.m/u.s)
+    wavelength_values1 = wavelength1.value
+    wavelength_values2 = wavelength2.to_value(wavelength1.units)
+
+    result = (wavelength_values2 - wavelength_values1) * _C_MS /\
+        ((wavelength_values1 + wavelength_values2) / 2)
+    return result * (u.m / u.s)
 
 
 @returns(length/time)
@@ -437,6 +540,12 @@ def get_params_file(filename):
                 values the additional systematic error found for each
                 transition.
 
+    Notes
+    -----
+    The contents of each file are cached after the first time it's read, so
+    the dictionaries returned are shared between calls and shouldn't be
+    modified. `clear_params_file_cache` empties the cache.
+
     """
 
     if not isinstance(filename, Path):
@@ -451,6 +560,35 @@ def get_params_file(filename):
         raise FileNotFoundError('The given filename could not be found:\n'
                                 f'Given filename: {hdf5_file}')
 
+    # Include the modification time in the cache key so a file which has been
+    # rewritten since it was last read gets loaded again.
+    hdf5_file = hdf5_file.resolve()
+    return dict(_load_params_file(str(hdf5_file),
+                                  hdf5_file.stat().st_mtime_ns))
+
+
+@lru_cache(maxsize=16)
+def _load_params_file(hdf5_file, modification_time):
+    """Load and return the contents of a fit results HDF5 file.
+
+    The results are cached, so the dictionaries they contain are shared
+    between calls with the same file and shouldn't be modified.
+
+    Parameters
+    ----------
+    hdf5_file : str
+        The full path to the HDF5 file to read.
+    modification_time : int
+        The modification time of the file in nanoseconds, only used as part
+        of the cache key.
+
+    Returns
+    -------
+    dict
+        A dictionary as described in `get_params_file`.
+
+    """
+
     results = {}
     with h5py.File(hdf5_file, 'r') as f:
         results['model_func'] = hickle.load(f, path='/fitting_function')
@@ -460,3 +598,9 @@ def get_params_file(filename):
         results['sigmas_sys'] = hickle.load(f, path='/sigma_sys_dict')
 
     return results
+
+
+def clear_params_file_cache():
+    """Empty the cache of fit results files read by `get_params_file`."""
+
+    _load_params_file.cache_clear()
@@ -241,3 +241,27 @@ class TestWavelength2Index(object):
         reversed_wavelengths = [x for x in reversed(wavelength_array)]
         assert vcl.wavelength2index(4001 * u.angstrom, reversed_wavelengths,
                                     reverse=True) == 0
+
+
+class TestOrderNumbers(object):
+
+    def testSingleOrders(self):
+        for ordinal, order in vcl.order_numbers.items():
+            assert vcl.ordinal_to_order(ordinal) == order
+            assert vcl.order_to_ordinal(order) == ordinal
+
+    def testArrayOfOrders(self):
+        ordinals = np.array([[1, 46], [47, 72]])
+        orders = vcl.ordinal_to_order(ordinals)
+        assert orders.tolist() == [[161, 116], [114, 89]]
+        assert np.array_equal(vcl.order_to_ordinal(orders), ordinals)
+
+    def testInvalidOrders(self):
+        with pytest.raises(KeyError):
+            vcl.ordinal_to_order(0)
+        with pytest.raises(KeyError):
+            vcl.ordinal_to_order([1, 73])
+        with pytest.raises(KeyError):
+            vcl.order_to_ordinal(115)
+        with pytest.raises(KeyError):
+            vcl.order_to_ordinal(-1)
@@ -9,14 +9,14 @@ This library contains functions to deal with opening 2D HARPS extracted e2ds
 files.
 """
 
-from copy import copy
 import datetime as dt
+from functools import lru_cache
 from math import isnan
 from pathlib import Path
 
 from astropy.io import fits
 import numpy as np
-from tqdm import tqdm, trange
+from tqdm import tqdm
 import unyt as u
 
 import varconlib as vcl
@@ -25,7 +25,7 @@ from varconlib.exceptions import (BadRadialVelocityError,
                                   NewCoefficientsNotFoundError,
                                   BlazeFileNotFoundError,
                                   WavelengthNotFoundInArrayError)
-from varconlib.miscellaneous import wavelength2index, shift_wavelength
+from varconlib.miscellaneous import shift_wavelength
 
 
 # Read some path variables from the config file.
@@ -64,6 +64,13 @@ order_barycenters = {0: 2058.19619875, 1: 2303.03101155, 2: 1714.78184979,
                      66: 1463.07051377, 67: 2091.18218294, 68: 2240.88136565,
                      69: 1762.46301572, 70: 2172.64792852, 71: 1904.59716115}
 
+# The same barycenters as an array, in order.
+_order_barycenters_array = np.array([order_barycenters[order]
+                                     for order in range(0, 72)])
+
+# Nominal pixel positions along an order, assuming all pixels have a size of 1.
+_PIXELS = np.arange(0, 4096, dtype=np.float64)
+
 
 class HARPSFile2D(object):
     """Class to contain data from a HARPS 2D extracted spectrum file.
@@ -147,9 +154,41 @@ class HARPSFile2D(object):
         return array
 
 
+@lru_cache(maxsize=32)
+def _read_blaze_array(blaze_file_path):
+    """Return the blaze function array from the given blaze file.
+
+    Many observations share the same blaze file, so the arrays read are cached
+    to avoid reading the same file repeatedly. The array returned is read-only,
+    since it may be shared between observations.
+
+    Parameters
+    ----------
+    blaze_file_path : `pathlib.Path`
+        The path to the blaze file to read.
+
+    Returns
+    -------
+    `np.ndarray`
+        A (72, 4096) array containing the blaze function value at each point
+        in the CCD.
+
+    """
+
+    blaze_array = np.array(HARPSFile2D(blaze_file_path)._rawData)
+    blaze_array.flags.writeable = False
+    return blaze_array
+
+
 class HARPSFile2DScience(HARPSFile2D):
     """Subclass of HARPSFile2D to handle observations specifically.
 
+    The photon flux and error arrays are kept in single precision (if the raw
+    data is), which is ample for the photon-noise-limited fluxes involved and
+    halves their size in memory and on disk. The wavelength arrays are always
+    double precision, since they need to be precise enough for measuring
+    radial velocities.
+
     """
 
     def __init__(self, FITSfile, update=[], new_coefficients=True,
@@ -202,6 +241,11 @@ class HARPSFile2DScience(HARPSFile2D):
             raise FileNotFoundError('The given path does not exist: \n'
                                     f'{self._filename}')
 
+        # Usually all the arrays will already have been written to the file,
+        # in which case they can be read without opening it for writing.
+        if not update and self._readArraysFromFile():
+            return
+
         if update:
             file_open_mode = 'update'
         else:
@@ -217,7 +261,9 @@ class HARPSFile2DScience(HARPSFile2D):
         self._header = hdulist[0].header
         data = hdulist[0].data
         self._rawData = self._reshape_if_necessary(data)
-        self._rawFluxArray = copy(self._rawData)
+        # Nothing modifies the raw flux in place, so it can share its data
+        # with the raw data array rather than being a copy of it.
+        self._rawFluxArray = self._rawData
         self._blazeFile = None
 
         # Define an error string for trying to update a file that hasn't
@@ -226,7 +272,7 @@ class HARPSFile2DScience(HARPSFile2D):
 
         # Define the verification level for FITS files not meeting the FITS
         # standard.
-        verify_action = 'warn'
+        verify_action = 'silentfix'
 
         # Try to read the wavelength array, or create it if it doesn't
         # exist.
@@ -237,12 +283,14 @@ class HARPSFile2DScience(HARPSFile2D):
                 raise RuntimeError(err_str)
             tqdm.write('Writing new wavelength HDU.')
             self.writeWavelengthHDU(hdulist, verify_action=verify_action,
+                                    flush=False,
                                     use_new_coefficients=new_coefficients,
                                     use_pixel_positions=pixel_positions)
         # If we're updating the file, overwrite the existing wavelengths.
         if ('ALL' in update) or ('WAVE' in update):
             tqdm.write('Overwriting wavelength HDU.')
             self.writeWavelengthHDU(hdulist, verify_action=verify_action,
+                                    flush=False,
                                     use_new_coefficients=new_coefficients,
                                     use_pixel_positions=pixel_positions)
 
@@ -255,12 +303,14 @@ class HARPSFile2DScience(HARPSFile2D):
                 raise RuntimeError(err_str)
             tqdm.write('Writing new barycentric wavelength HDU.')
             self.writeBarycentricHDU(hdulist, self.barycentricArray,
-                                     'BARY', verify_action=verify_action)
+                                     'BARY', verify_action=verify_action,
+                                     flush=False)
         if ('ALL' in update) or ('BARY' in update):
             tqdm.write('Overwriting barycentric wavelength HDU.')
             del self._barycentricArray
             self.writeBarycentricHDU(hdulist, self.barycentricArray,
-                                     'BARY', verify_action=verify_action)
+                                     'BARY', verify_action=verify_action,
+                                     flush=False)
 
         # Try to read the barycentric lower pixel edge array, or create it
         # if it doesn't exist yet.
@@ -277,13 +327,15 @@ class HARPSFile2DScience(HARPSFile2D):
                 tqdm.write('Writing new pixel lower edges HDU.')
                 self.writeBarycentricHDU(hdulist, self.pixelLowerArray,
                                          'PIXLOWER',
-                                         verify_action=verify_action)
+                                         verify_action=verify_action,
+                                         flush=False)
         if ('ALL' in update) or ('PIXLOWER' in update):
             tqdm.write('Overwriting lower pixel wavelength HDU.')
             del self._pixelLowerArray
             pixel_array = self.pixelLowerArray
             self.writeBarycentricHDU(hdulist, pixel_array, 'PIXLOWER',
-                                     verify_action=verify_action)
+                                     verify_action=verify_action,
+                                     flush=False)
 
         # Try to read the barycentric upper pixel edge array, or create it
         # if it doesn't exist yet.
@@ -300,13 +352,15 @@ class HARPSFile2DScience(HARPSFile2D):
                 tqdm.write('Writing new pixel upper edges HDU.')
                 self.writeBarycentricHDU(hdulist, self.pixelUpperArray,
                                          'PIXUPPER',
-                                         verify_action=verify_action)
+                                         verify_action=verify_action,
+                                         flush=False)
         if ('ALL' in update) or ('PIXUPPER' in update):
             tqdm.write('Overwriting lower pixel wavelength HDU.')
             del self._pixelUpperArray
             pixel_array = self.pixelUpperArray
             self.writeBarycentricHDU(hdulist, pixel_array, 'PIXUPPER',
-                                     verify_action=verify_action)
+                                     verify_action=verify_action,
+                                     flush=False)
 
         # Try to read the flux array, or create it if it doesn't exist.
         try:
@@ -314,12 +368,15 @@ class HARPSFile2DScience(HARPSFile2D):
         except KeyError:
             if ('ALL' in update) or ('FLUX' in update):
                 raise RuntimeError(err_str)
-            self.writePhotonFluxHDU(hdulist, verify_action=verify_action)
+            self.writePhotonFluxHDU(hdulist, verify_action=verify_action,
+                                    flush=False)
             tqdm.write('Writing new photon flux HDU.')
         # If we're updating the file, overwrite the existing fluxes.
         if ('ALL' in update) or ('FLUX' in update):
             tqdm.write('Overwriting photon flux HDU.')
-            self.writePhotonFluxHDU(hdulist, verify_action=verify_action)
+            del self._photonFluxArray
+            self.writePhotonFluxHDU(hdulist, verify_action=verify_action,
+                                    flush=False)
 
         # Try to read the error array, or create it if it doesn't exist.
         try:
@@ -327,12 +384,15 @@ class HARPSFile2DScience(HARPSFile2D):
         except KeyError:
             if ('ALL' in update) or ('ERR' in update):
                 raise RuntimeError(err_str)
-            self.writeErrorHDU(hdulist, verify_action=verify_action)
+            self.writeErrorHDU(hdulist, verify_action=verify_action,
+                               flush=False)
             tqdm.write('Writing new error HDU.')
         # If we're updating the file, overwrite the existing uncertainties.
         if ('ALL' in update) or ('ERR' in update):
             tqdm.write('Overwriting error array HDU.')
-            self.writeErrorHDU(hdulist, verify_action=verify_action)
+            del self._errorArray
+            self.writeErrorHDU(hdulist, verify_action=verify_action,
+                               flush=False)
 
         # Try to read the blaze array, or create it if it doesn't exist.
         try:
@@ -340,14 +400,65 @@ class HARPSFile2DScience(HARPSFile2D):
         except KeyError:
             if ('ALL' in update) or ('BLAZE' in update):
                 raise RuntimeError(err_str)
-            self.writeBlazeHDU(hdulist, verify_action=verify_action)
+            self.writeBlazeHDU(hdulist, verify_action=verify_action,
+                               flush=False)
             tqdm.write('Writing new blaze HDU.')
         # If we're updating the file, overwrite the existing uncertainties.
         if ('ALL' in update) or ('BLAZE' in update):
             tqdm.write('Overwriting blaze array HDU.')
-            self.writeBlazeHDU(hdulist, verify_action=verify_action)
+            del self._blazeArray
+            self.writeBlazeHDU(hdulist, verify_action=verify_action,
+                               flush=False)
+
+        hdulist.close(output_verify=verify_action)
+
+    def _readArraysFromFile(self):
+        """Read the observation and all its arrays from its file, if they all
+        exist.
+
+        The file is opened read-only and memory-mapped, so only the data
+        actually used is read from disk.
+
+        Returns
+        -------
+        bool
+            *True* if all the arrays were read from the file, or *False* if
+            any of them are missing and need to be created.
+
+        """
 
-        hdulist.close(output_verify='warn')
+        with fits.open(self._filename, mode='readonly',
+                       memmap=True) as hdulist:
+            self._header = hdulist[0].header
+            data = hdulist[0].data
+            self._rawData = self._reshape_if_necessary(data)
+            self._rawFluxArray = self._rawData
+            self._blazeFile = None
+
+            hdu_names = {hdu.name for hdu in hdulist}
+            if not {'WAVE', 'BARY', 'FLUX', 'ERR', 'BLAZE'} <= hdu_names:
+                return False
+            # The pixel edge arrays can only be created if there are new
+            # calibration coefficients for this observation.
+            if not {'PIXLOWER', 'PIXUPPER'} <= hdu_names:
+                try:
+                    self.getWavelengthCalibrationFile()
+                except NewCoefficientsNotFoundError:
+                    pass
+                else:
+                    return False
+
+            self._wavelengthArray = hdulist['WAVE'].data * u.angstrom
+            self._barycentricArray = hdulist['BARY'].data * u.angstrom
+            if 'PIXLOWER' in hdu_names:
+                self._pixelLowerArray = hdulist['PIXLOWER'].data * u.angstrom
+            if 'PIXUPPER' in hdu_names:
+                self._pixelUpperArray = hdulist['PIXUPPER'].data * u.angstrom
+            self._photonFluxArray = hdulist['FLUX'].data
+            self._errorArray = hdulist['ERR'].data
+            self._blazeArray = hdulist['BLAZE'].data
+
+        return True
 
     @property
     def wavelengthArray(self):
@@ -672,24 +783,28 @@ class HARPSFile2DScience(HARPSFile2D):
             # Use the new pixel positions file provided.
             pixel_positions = self.pixelPosArray
         elif use_pixel_positions is False:
-            pixel_positions = np.array([[x for x in range(0, 4096)]
-                                       for row in range(0, 72)])
-
-        source_array = self._rawFluxArray
-        wavelength_array = np.zeros(source_array.shape, dtype=float)
-        # Step through the 72 spectral orders
-        for order in trange(0, 72, total=72, unit='orders'):
-            if use_new_coefficients:
-                order_barycenter = order_barycenters[order]
-            else:
-                order_barycenter = 0
-            # Iterate through the third-order polynomial fit coefficients
-            for i in range(0, 4, 1):
-                coeff = 'ESO DRS CAL TH COEFF LL{0}'.format((4 * order) + i)
-                coeff_val = coeffs_file.getHeaderCard(coeff)
-                for pixel, pixel_pos in enumerate(pixel_positions[order, :]):
-                    wavelength_array[order, pixel] += coeff_val *\
-                      ((pixel_pos - order_barycenter) ** i)
+            pixel_positions = _PIXELS
+
+        # Read the third-order polynomial fit coefficients for all 72 orders
+        # from the header at once, into a (72, 4) array.
+        coeffs = np.fromiter((coeffs_file.getHeaderCard(
+                              'ESO DRS CAL TH COEFF LL{0}'.format(i))
+                              for i in range(0, 72 * 4)),
+                             dtype=float, count=72 * 4).reshape(72, 4)
+
+        if use_new_coefficients:
+            pixels = pixel_positions - _order_barycenters_array[:, np.newaxis]
+        else:
+            pixels = np.broadcast_to(pixel_positions, (72, 4096))
+
+        # Evaluate the polynomial for every pixel in every order at once using
+        # Horner's method, updating a single array in place rather than
+        # creating a new temporary array for each operation.
+        wavelength_array = coeffs[:, 3, np.newaxis] * pixels
+        for i in (2, 1):
+            wavelength_array += coeffs[:, i, np.newaxis]
+            wavelength_array *= pixels
+        wavelength_array += coeffs[:, 0, np.newaxis]
 
         return wavelength_array * u.angstrom
 
@@ -705,7 +820,8 @@ class HARPSFile2DScience(HARPSFile2D):
 
         """
 
-        return air2vacESO(array)
+        # Do the conversion on the plain values, without unit handling.
+        return air2vacESO(array.to_value(u.angstrom)) * u.angstrom
 
     def barycenterCorrect(self, array):
         """Correct the given wavelength array by the barycentric Earth radial
@@ -724,7 +840,12 @@ class HARPSFile2DScience(HARPSFile2D):
 
         """
 
-        return self.shiftWavelengthArray(array, self.BERV)
+        # The BERV is the same for the whole array, so rather than shifting
+        # each wavelength separately, compute the Doppler factor once and
+        # scale the array by it.
+        doppler_factor = 1 + float((self.BERV / u.c).to_value(u.dimensionless))
+
+        return array * doppler_factor
 
     def getPhotonFluxArray(self):
         """Calibrate the raw flux array using the gain, then correct it using
@@ -761,12 +882,19 @@ class HARPSFile2DScience(HARPSFile2D):
         dark_noise = 12
 
         photon_flux_array = self._rawFluxArray
-        error_array = np.array([[np.sqrt(x + dark_noise ** 2) if x >= 0
-                                 else 1e5 for x in row]
-                                for row in photon_flux_array], dtype=float)
+        # Build the errors in a single array, operating on it in place rather
+        # than creating a new temporary array at each step. Pixels with
+        # negative flux are given a very large error.
+        negative_flux = photon_flux_array < 0
+        error_array = np.maximum(photon_flux_array, 0,
+                                 dtype=np.result_type(photon_flux_array,
+                                                      np.float32))
+        error_array += dark_noise ** 2
+        np.sqrt(error_array, out=error_array)
+        error_array[negative_flux] = 1e5
 
         # Correct the error array by the blaze function:
-        error_array = error_array / self.blazeArray
+        error_array /= self.blazeArray
 
         return error_array
 
@@ -781,9 +909,10 @@ class HARPSFile2DScience(HARPSFile2D):
             point in the CCD.
         """
 
-        return HARPSFile2D(self.getBlazeFile())._rawData
+        return _read_blaze_array(self.getBlazeFile())
 
-    def writeWavelengthHDU(self, hdulist, verify_action='warn', **kwargs):
+    def writeWavelengthHDU(self, hdulist, verify_action='silentfix', flush=True,
+                           **kwargs):
         """Write out a wavelength array HDU to the currently opened file.
 
         Parameters
@@ -795,22 +924,20 @@ class HARPSFile2DScience(HARPSFile2D):
             ``'silentfix'``, or ``'warn'``.
             `<http://docs.astropy.org/en/stable/io/fits/api/verification.html
             #verify>`_
-            The default value is to print a warning upon encountering a
-            violation of any FITS standard.
+            The default value is to silently fix any violation of the FITS
+            standard that can be fixed, without emitting warnings.
+        flush : bool, Default : True
+            Whether to write the changes to disk immediately. If *False*, they
+            will be written the next time `hdulist` is flushed or closed.
 
         """
 
         self._wavelengthArray = self.getWavelengthArray(**kwargs)
-        # Create an HDU for the wavelength array.
-        wavelength_HDU = fits.ImageHDU(data=self.wavelengthArray, name='WAVE')
-        try:
-            hdulist['WAVE'] = wavelength_HDU
-        except KeyError:
-            hdulist.append(wavelength_HDU)
-        hdulist.flush(output_verify=verify_action, verbose=False)
+        self._writeHDU(hdulist, self.wavelengthArray, 'WAVE',
+                       verify_action=verify_action, flush=flush)
 
     def writeBarycentricHDU(self, hdulist, array, array_name,
-                            verify_action='warn'):
+                            verify_action='silentfix', flush=True):
         """Write out an array of barycentric vacuum wavelengths to the
         currently-opened file.
 
@@ -829,20 +956,19 @@ class HARPSFile2DScience(HARPSFile2D):
             ``'silentfix'``, or ``'warn'``.
             `<http://docs.astropy.org/en/stable/io/fits/api/verification.html
             #verify>`_
-            The default value is to print a warning upon encountering a
-            violation of any FITS standard.
+            The default value is to silently fix any violation of the FITS
+            standard that can be fixed, without emitting warnings.
+        flush : bool, Default : True
+            Whether to write the changes to disk immediately. If *False*, they
+            will be written the next time `hdulist` is flushed or closed.
 
         """
 
-        hdu = fits.ImageHDU(data=array, name=array_name)
-        try:
-            hdulist[array_name] = hdu
-        except KeyError:
-            hdulist.append(hdu)
+        self._writeHDU(hdulist, array, array_name,
+                       verify_action=verify_action, flush=flush)
 
-        hdulist.flush(output_verify=verify_action, verbose=False)
-
-    def writePhotonFluxHDU(self, hdulist, verify_action='warn'):
+    def writePhotonFluxHDU(self, hdulist, verify_action='silentfix',
+                           flush=True):
         """Write out a photon flux array HDU to the currently opened file.
 
         Parameters
@@ -854,20 +980,19 @@ class HARPSFile2DScience(HARPSFile2D):
             ``'silentfix'``, or ``'warn'``.
             `<http://docs.astropy.org/en/stable/io/fits/api/verification.html
             #verify>`_
-            The default value is to print a warning upon encountering a
-            violation of any FITS standard.
+            The default value is to silently fix any violation of the FITS
+            standard that can be fixed, without emitting warnings.
+        flush : bool, Default : True
+            Whether to write the changes to disk immediately. If *False*, they
+            will be written the next time `hdulist` is flushed or closed.
 
         """
 
-        # Create an HDU for the photon flux array.
-        photon_flux_HDU = fits.ImageHDU(data=self.photonFluxArray, name='FLUX')
-        try:
-            hdulist['FLUX'] = photon_flux_HDU
-        except KeyError:
-            hdulist.append(photon_flux_HDU)
-        hdulist.flush(output_verify=verify_action, verbose=False)
+        self._writeHDU(hdulist, self.photonFluxArray, 'FLUX',
+                       verify_action=verify_action, flush=flush)
 
-    def writeErrorHDU(self, hdulist, verify_action='warn'):
+    def writeErrorHDU(self, hdulist, verify_action='silentfix',
+                      flush=True):
         """Write out an error array HDU to the currently opened file.
 
         Parameters
@@ -880,20 +1005,19 @@ class HARPSFile2DScience(HARPSFile2D):
             More information can be found in the Astropy `documentation.
             `<http://docs.astropy.org/en/stable/io/fits/api/verification.html
             #verify>`_
-            The default value is to print a warning upon encountering a
-            violation of any FITS standard.
+            The default value is to silently fix any violation of the FITS
+            standard that can be fixed, without emitting warnings.
+        flush : bool, Default : True
+            Whether to write the changes to disk immediately. If *False*, they
+            will be written the next time `hdulist` is flushed or closed.
 
         """
 
-        # Create an HDU for the error array.
-        error_HDU = fits.ImageHDU(data=self.errorArray, name='ERR')
-        try:
-            hdulist['ERR'] = error_HDU
-        except KeyError:
-            hdulist.append(error_HDU)
-        hdulist.flush(output_verify=verify_action, verbose=False)
+        self._writeHDU(hdulist, self.errorArray, 'ERR',
+                       verify_action=verify_action, flush=flush)
 
-    def writeBlazeHDU(self, hdulist, verify_action='warn'):
+    def writeBlazeHDU(self, hdulist, verify_action='silentfix',
+                      flush=True):
         """Write out a blaze function array to the currently opened file.
 
         Parameters
@@ -906,18 +1030,44 @@ class HARPSFile2DScience(HARPSFile2D):
             More information can be found in the Astropy `documentation.
             `<http://docs.astropy.org/en/stable/io/fits/api/verification.html
             #verify>`_
-            The default value is to print a warning upon encountering a
-            violation of any FITS standard.
+            The default value is to silently fix any violation of the FITS
+            standard that can be fixed, without emitting warnings.
+        flush : bool, Default : True
+            Whether to write the changes to disk immediately. If *False*, they
+            will be written the next time `hdulist` is flushed or closed.
 
         """
 
-        blaze_HDU = fits.ImageHDU(data=self.blazeArray, name='BLAZE')
+        self._writeHDU(hdulist, self.blazeArray, 'BLAZE',
+                       verify_action=verify_action, flush=flush)
+
+    def _writeHDU(self, hdulist, array, array_name, verify_action='silentfix',
+                  flush=True):
+        """Add an array to the given HDU list, replacing any existing HDU of
+        the same name.
+
+        Parameters
+        ----------
+        hdulist : an astropy HDUList object
+            The HDU list of the file to modify.
+        array : array-like
+            The array to be written.
+        array_name : str
+            The name of the HDU to write the array to.
+        verify_action : str, optional
+            The verification level to use if the HDU list is flushed.
+        flush : bool, Default : True
+            Whether to write the changes to disk immediately.
+
+        """
 
+        hdu = fits.ImageHDU(data=array, name=array_name)
         try:
-            hdulist['BLAZE'] = blaze_HDU
+            hdulist[array_name] = hdu
         except KeyError:
-            hdulist.append(blaze_HDU)
-        hdulist.flush(output_verify=verify_action, verbose=False)
+            hdulist.append(hdu)
+        if flush:
+            hdulist.flush(output_verify=verify_action, verbose=False)
 
     def shiftWavelengthArray(self, wavelength_array, shift_velocity):
         """Doppler shift a wavelength array by an amount equivalent to a given
@@ -983,28 +1133,30 @@ class HARPSFile2DScience(HARPSFile2D):
 
         wavelength_to_find = wavelength.to(u.angstrom)
 
+        # Do the comparisons using plain floats in angstroms, as comparing
+        # unyt objects is much slower.
+        wavelength_value = float(wavelength_to_find.value)
+        order_limits = wavelength_array[:, [0, -1]].to_value(u.angstrom)
+
         # Make sure the wavelength to find is in the array in the first place.
-        err_str = "Given wavelength not in array limits: {} ({}, {})".format(
-                  wavelength_to_find, wavelength_array[0, 0],
-                  wavelength_array[-1, -1])
-        if not (wavelength_array[0, 0] <= wavelength_to_find
-                <= wavelength_array[-1, -1]):
+        if not (order_limits[0, 0] <= wavelength_value
+                <= order_limits[-1, -1]):
+            err_str = "Given wavelength not in array limits: {} ({}, {})".\
+                format(wavelength_to_find, wavelength_array[0, 0],
+                       wavelength_array[-1, -1])
             raise WavelengthNotFoundInArrayError(err_str)
 
-        # Set up a list to hold the indices of the orders where the wavelength
-        # is found.
-        orders_wavelength_found_in = []
-        for order in range(0, 72):
-            if (wavelength_array[order, 0] <= wavelength_to_find
-                    <= wavelength_array[order, -1]):
-                orders_wavelength_found_in.append(order)
-                if len(orders_wavelength_found_in) == 1:
-                    continue
-                elif len(orders_wavelength_found_in) == 2:
-                    break
-
-        assert len(orders_wavelength_found_in) > 0, 'Wavelength not found'
-        ' in array.'
+        # Find the indices of the (first two) orders where the wavelength is
+        # found by comparing it to the ends of all the orders at once.
+        orders_wavelength_found_in = np.nonzero(
+            (order_limits[:, 0] <= wavelength_value) &
+            (wavelength_value <= order_limits[:, 1]))[0][:2].tolist()
+
+        # The wavelength can still fall in a gap between two orders.
+        if not orders_wavelength_found_in:
+            raise WavelengthNotFoundInArrayError('Given wavelength falls'
+                                                 ' between orders:'
+                                                 f' {wavelength_to_find}')
 
         if mid_most:
             # If only one array: great, return it.
@@ -1016,10 +1168,12 @@ class HARPSFile2DScience(HARPSFile2D):
             # of the 4096-element array.
             elif len(orders_wavelength_found_in) == 2:
                 order1, order2 = orders_wavelength_found_in
-                index1 = wavelength2index(wavelength_to_find,
-                                          wavelength_array[order1])
-                index2 = wavelength2index(wavelength_to_find,
-                                          wavelength_array[order2])
+                index1 = np.searchsorted(
+                    wavelength_array[order1].to_value(u.angstrom),
+                    wavelength_value)
+                index2 = np.searchsorted(
+                    wavelength_array[order2].to_value(u.angstrom),
+                    wavelength_value)
                 # Check which index is closest to the pixel in the geometric
                 # center of the 4096-length array, given 0-indexing in Python.
                 if abs(index1 - 2047.5) > abs(index2 - 2047.5):
@@ -1029,6 +1183,70 @@ class HARPSFile2DScience(HARPSFile2D):
         else:
             return tuple(orders_wavelength_found_in)
 
+    def findWavelengths(self, wavelengths, wavelength_array):
+        """Find the orders containing multiple wavelengths, and where in them.
+
+        This is a vectorized version of `findWavelength` (with `mid_most` set
+        to *True*) for finding many wavelengths in the same array at once. For
+        wavelengths found in two orders, the order where the wavelength falls
+        closest to the geometric center of the CCD is returned.
+
+        Parameters
+        ----------
+        wavelengths : `unyt.unyt_array`
+            A one-dimensional array of wavelengths to find in the wavelength
+            array.
+        wavelength_array : `unyt.unyt_array`
+            An array of wavelengths in the shape of a HARPS extracted spectrum
+            (72, 4096) to be searched.
+
+        Returns
+        -------
+        tuple of `numpy.ndarray`
+            Two arrays of ints of the same length as `wavelengths`. The first
+            contains the index of the order each wavelength is found in (in the
+            range [0, 71]), and the second the index in that order at which
+            the wavelength would be inserted to keep it sorted.
+
+        """
+
+        wavelength_values = np.atleast_1d(wavelengths.to_value(u.angstrom))
+        array_values = wavelength_array.to_value(u.angstrom)
+
+        # Find which orders each wavelength falls within.
+        in_orders = (array_values[:, 0] <= wavelength_values[:, np.newaxis]) &\
+            (wavelength_values[:, np.newaxis] <= array_values[:, -1])
+
+        not_found = ~in_orders.any(axis=1)
+        if not_found.any():
+            missing = wavelength_values[not_found]
+            raise WavelengthNotFoundInArrayError('Given wavelength(s) not in'
+                                                 ' array (in angstroms):'
+                                                 f' {missing}')
+
+        # Wavelengths can appear in at most two (adjacent) orders, so take the
+        # first and last orders each is found in (which will be the same for
+        # wavelengths found in only one order).
+        first_orders = in_orders.argmax(axis=1)
+        last_orders = 71 - in_orders[:, ::-1].argmax(axis=1)
+
+        first_indices = np.empty_like(first_orders)
+        last_indices = np.empty_like(last_orders)
+        for orders, indices in ((first_orders, first_indices),
+                                (last_orders, last_indices)):
+            for order in np.unique(orders):
+                in_this_order = orders == order
+                indices[in_this_order] = np.searchsorted(
+                    array_values[order], wavelength_values[in_this_order])
+
+        # Pick whichever order has the wavelength closest to the center of the
+        # CCD, preferring the first order in case of a tie.
+        use_last = np.abs(first_indices - 2047.5) >\
+            np.abs(last_indices - 2047.5)
+
+        return (np.where(use_last, last_orders, first_orders),
+                np.where(use_last, last_indices, first_indices))
+
     def plotErrorbar(self, order, passed_axis, min_index=None,
                      max_index=None, *args, **kwargs):
         """Create an errorbar plot of a single order of the observation.
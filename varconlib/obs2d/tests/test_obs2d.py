@@ -181,6 +181,16 @@ class TestScience2DFile(object):
         assert s.findWavelength(5034 * u.angstrom, s.barycentricArray,
                                 mid_most=False) == (39, 40)
 
+    def testFindWavelengths(self, s):
+        wavelengths = [5039, 6600] * u.angstrom
+        orders, indices = s.findWavelengths(wavelengths, s.barycentricArray)
+        assert orders.tolist() == [40, 67]
+        for order, index, wavelength in zip(orders, indices, wavelengths):
+            assert s.barycentricArray[order, index - 1] < wavelength
+            assert s.barycentricArray[order, index] >= wavelength
+        with pytest.raises(WavelengthNotFoundInArrayError):
+            s.findWavelengths([5039, 8000] * u.angstrom, s.barycentricArray)
+
     def testUpdateFile(self, generic_test_file):
         a = HARPSFile2DScience(generic_test_file)
         a = HARPSFile2DScience(generic_test_file, update=['ALL'])
@@ -10,15 +10,16 @@ information about them (via plots or otherwise).
 """
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 import csv
 import datetime as dt
-from glob import glob
+from functools import partial
 from itertools import tee
 import lzma
 import os
 from pathlib import Path
 import pickle
-import re
 
 from matplotlib.gridspec import GridSpec
 import matplotlib.pyplot as plt
@@ -26,6 +27,7 @@ import matplotlib.dates as mdates
 import matplotlib.ticker as ticker
 import numpy as np
 import numpy.ma as ma
+from p_tqdm import p_imap
 from tabulate import tabulate
 from tqdm import tqdm
 import unyt as u
@@ -60,6 +62,9 @@ def pairwise(iterable):
 
 def link_fit_plots(transition_plots_dir):
 
+    # Collect the links to make for all transitions first, so they can all be
+    # made at once.
+    sources, destinations = [], []
     for transition in tqdm(transitions_list):
 
         wavelength_str = transition.label
@@ -74,17 +79,27 @@ def link_fit_plots(transition_plots_dir):
         for plot_type, directory in zip(('close_up', 'context'),
                                         (close_up_dir, context_dir)):
 
-            search_str = str(data_dir) +\
-                '/HARPS*/plots_{}/{}/*{}*.png'.format(args.suffix,
-                                                      plot_type,
-                                                      wavelength_str)
+            search_str = 'HARPS*/plots_{}/{}/*{}*.png'.format(args.suffix,
+                                                              plot_type,
+                                                              wavelength_str)
             vprint(search_str)
 
-            files_to_link = [Path(path) for path in glob(search_str)]
-            for file_to_link in files_to_link:
-                dest_name = directory / file_to_link.name
-                if not dest_name.exists():
-                    os.link(file_to_link, dest_name)
+            # Check which plots are already linked from a single listing of
+            # the directory rather than checking each one separately.
+            with os.scandir(directory) as entries:
+                existing_names = {entry.name for entry in entries}
+
+            for file_to_link in data_dir.glob(search_str):
+                if file_to_link.name not in existing_names:
+                    sources.append(file_to_link)
+                    destinations.append(directory / file_to_link.name)
+
+    # Making the links is mostly waiting on the file system, so use threads to
+    # make several at a time.
+    with ThreadPoolExecutor() as executor:
+        for _ in tqdm(executor.map(os.link, sources, destinations),
+                      total=len(sources)):
+            pass
 
 
 def create_transition_offset_plots(plots_dir):
@@ -585,22 +600,296 @@ def create_chi_squared_plots():
     os.link(file_name, dest_name)
 
 
-# Write out a CSV file containing the pair separation values for all
-# observations of this star.
-# TODO: update
-def write_csv(column_names):
+def get_fit_labels(transitions_list):
+    """Return the labels of the fits made for a list of transitions.
+
+    Parameters
+    ----------
+    transitions_list : list of `transition_line.Transition` objects
+        The transitions which were fit, in the order they were fit in.
+
+    Returns
+    -------
+    list of str
+        The labels of the fits (transition label and order), in the order they
+        are saved in.
+
+    """
+
+    return [f'{transition.label}_{order_num}'
+            for transition in transitions_list
+            for order_num in transition.ordersToFitIn]
+
+
+def get_pair_labels(pairs_list):
+    """Return the labels of the pairs to measure, and of their transitions'
+    fits.
+
+    Parameters
+    ----------
+    pairs_list : list of `transition_pair.TransitionPair` objects
+        The pairs to find the separations of.
+
+    Returns
+    -------
+    list of tuples
+        A tuple for each pair in each order it's measured in, of the pair
+        label, the label of the pair in that order, and the labels of the fits
+        of its higher- and lower-energy transitions in that order.
+
+    """
+
+    pair_labels = []
+    for pair in pairs_list:
+        for order_num in pair.ordersToMeasureIn:
+            pair_labels.append((pair.label,
+                                '_'.join((pair.label, str(order_num))),
+                                '_'.join((pair._higherEnergyTransition.label,
+                                          str(order_num))),
+                                '_'.join((pair._lowerEnergyTransition.label,
+                                          str(order_num)))))
+
+    return pair_labels
+
+
+def plot_fits(obs_name, fits_dict, plots_dir, verbose=False):
+    """Recreate the close-up and context plots of each fit in an observation.
+
+    Parameters
+    ----------
+    obs_name : str
+        The name of the observation, used in the names of the plots.
+    fits_dict : dict
+        A dictionary of the fits in the observation, with their labels as keys
+        and *None* for fits which failed.
+    plots_dir : `pathlib.Path`
+        The directory containing the 'close_up' and 'context' directories to
+        save the plots in.
+
+    Optional
+    --------
+    verbose : bool, Default : False
+        If *True*, print more information about the process.
+
+    """
+
+    vprint = vcl.verbose_print(verbose)
+
+    # plotFit accepts plain strings, so build the common start of each plot
+    # path once rather than joining paths for every fit.
+    closeup_prefix = str(plots_dir / 'close_up' / obs_name) + '_'
+    context_prefix = str(plots_dir / 'context' / obs_name) + '_'
+
+    for tr_label, fit in fits_dict.items():
+        plot_closeup = closeup_prefix + tr_label + '_close.png'
+        plot_context = context_prefix + tr_label + '_context.png'
+        vprint('Creating plots at:')
+        vprint(plot_closeup)
+        vprint(plot_context)
+        if fit is not None:
+            fit.plotFit(plot_closeup, plot_context)
+        else:
+            err_msg = f'The fit for {tr_label} failed for'\
+                      f' observation {obs_name}, and'\
+                      ' will need to be re-reduced to be'\
+                      ' created.'
+            tqdm.write(err_msg)
+
+
+def read_pickle_file(pickle_file, fit_labels, pair_labels,
+                     fit_plots_dir_name=None, write_csv=False, verbose=False):
+    """Read the fits for an observation and find its pair separations.
+
+    This only depends on its arguments, so it can be run for multiple
+    observations in parallel.
+
+    Parameters
+    ----------
+    pickle_file : `pathlib.Path`
+        The path to an LZMA-compressed pickle file of the fits for a single
+        observation.
+    fit_labels : list of str
+        The labels of the fits in the file, as returned by `get_fit_labels`.
+    pair_labels : list of tuples
+        The labels of the pairs to find the separations of, as returned by
+        `get_pair_labels`.
+
+    Optional
+    --------
+    fit_plots_dir_name : str, Default : None
+        If given, also recreate the plots of the fits in the observation (see
+        `plot_fits`) in the directory with this name in the observation's
+        directory.
+    write_csv : bool, Default : False
+        If *True*, also return the information about each fit needed to write
+        it out to a CSV file.
+    verbose : bool, Default : False
+        If *True*, print more information about the process.
+
+    Returns
+    -------
+    tuple
+        A tuple of the observation name, the observation date, a dictionary of
+        the information for writing out to a CSV file about each fit in the
+        observation (from `TransitionFit.getFitInformation`) with their labels
+        as keys (or *None* if `write_csv` is *False*), arrays of the velocity separations and their errors (in m/s)
+        for each pair in `pair_labels` (NaN for pairs which couldn't be
+        measured), and a list of the pair separations and their errors for
+        writing out to a CSV file.
+
+    """
+
+    vprint = vcl.verbose_print(verbose)
+
+    # The observation name is the part of the pickle filename up to the end
+    # of "_e2ds_A", e.g. HARPS.2012-02-26T04:02:48.797_e2ds_A.
+    obs_name = pickle_file.stem[:pickle_file.stem.rindex('_e2ds_A') + 7]
+    assert obs_name.startswith('HARPS'),\
+        f'Unexpected pickle file name: {pickle_file.name}'
+
+    tqdm.write('Analyzing results from {}'.format(obs_name))
+    # Unpickle straight from the decompressing file object, so the whole
+    # decompressed pickle never needs to be held in memory at once (this
+    # matters with several observations being read in parallel).
+    with lzma.open(pickle_file, 'rb') as f:
+        fits_list = pickle.load(f)
+
+    # Set up a dictionary to map fits in this observation to
+    # transitions:
+    fits_dict = {}
+    # The mean wavelength (in Angstroms) and its error (in m/s) of each fit,
+    # without units, so they only need to be converted once.
+    fit_values = {}
+    for fit, label in zip(fits_list, fit_labels):
+        if fit is not None:
+            assert fit.label == label, f'{fit.label} does not match'\
+                                        'generated label: {label}'
+            fits_dict[label] = fit
+            fit_values[label] = (fit.mean.to_value(u.angstrom),
+                                 fit.meanErrVel.to_value(u.m / u.s))
+        else:
+            fits_dict[label] = None
+
+    # This can be used to remake plots for individual fits without rerunning
+    # the fitting process in case the plot visual format changes. Doing it
+    # here means the plots are rendered in parallel too.
+    if fit_plots_dir_name is not None:
+        plot_fits(obs_name, fits_dict,
+                  pickle_file.parents[1] / fit_plots_dir_name,
+                  verbose=verbose)
+
+    measured_values, measured_indices, measured_columns = [], [], []
+    for fit in fits_list:
+        # Iterate through the list until a non-None observation is
+        # found.
+        try:
+            obs_date = fit.dateObs
+            separations_list = [obs_name, fit.dateObs.
+                                isoformat(timespec='milliseconds')]
+            break
+        except AttributeError:
+            # If the fit is None, this will catch it.
+            pass
+
+    for pair_index, labels in enumerate(pair_labels):
+        pair_name, pair_label, high_E_label, low_E_label = labels
+        # Check that fits for both transitions exist.
+        if fits_dict[high_E_label] and fits_dict[low_E_label]:
+            fits_pair = [fits_dict[high_E_label],
+                         fits_dict[low_E_label]]
+
+            assert fits_pair[0].order == fits_pair[1].order,\
+                f"Orders don't match for {fits_pair}"
+            high_E_mean, high_E_error = fit_values[high_E_label]
+            low_E_mean, low_E_error = fit_values[low_E_label]
+            if np.isnan(high_E_error) or np.isnan(low_E_error):
+                # Similar to above, fill in list with placeholder
+                # values.
+                vprint(f'{pair_name} in {obs_name} has a'
+                       ' NaN velocity offset!')
+                vprint(fits_pair[0].meanErrVel)
+                vprint(fits_pair[1].meanErrVel)
+                separations_list.extend(['NaN', ' NaN'])
+                continue
+
+        else:
+            # Measurement of one or both transition doesn't
+            # exist, so skip it (but fill in the list to prevent
+            # getting out of sync)
+            separations_list.extend(['N/A', ' N/A'])
+            continue
+
+        # If both transitions have non-NaN values, leave space for the
+        # velocity separation and error, to be filled in below for all
+        # such pairs at once.
+        measured_values.append((high_E_mean, low_E_mean,
+                                high_E_error, low_E_error))
+        measured_indices.append(pair_index)
+        measured_columns.append(len(separations_list))
+        separations_list.extend([None, None])
+
+    separations = np.full(len(pair_labels), np.nan)
+    separation_errors = np.full(len(pair_labels), np.nan)
+    if measured_values:
+        high_E_means, low_E_means, high_E_errors, low_E_errors =\
+            np.array(measured_values).T
+        # Units are only attached for the single call to find the velocity
+        # separations of all the pairs.
+        separations[measured_indices] = wave2vel(high_E_means * u.angstrom,
+                                                 low_E_means * u.angstrom
+                                                 ).to_value(u.m / u.s)
+        separation_errors[measured_indices] = np.hypot(high_E_errors,
+                                                       low_E_errors)
+        for column, index in zip(measured_columns, measured_indices):
+            separations_list[column:column + 2] = [separations[index],
+                                                   separation_errors[index]]
+
+    # Only send back the information about the fits needed for the CSV files,
+    # not the fits themselves, and only if it's going to be written out.
+    if write_csv:
+        fits_info = {label: fit.getFitInformation()
+                     for label, fit in fits_dict.items() if fit is not None}
+    else:
+        fits_info = None
+
+    return (obs_name, obs_date, fits_info, separations, separation_errors,
+            separations_list)
+
+
+def open_csv_files(exit_stack, column_names, fit_labels):
+    """Open the CSV files to write results for each observation to as they're
+    read.
+
+    One file holds the pair separation values for all observations of this
+    star, and there's another file for each fit (transition and order) with
+    information about it for each observation.
+
+    Parameters
+    ----------
+    exit_stack : `contextlib.ExitStack`
+        The context stack to enter the opened files into, so they'll all be
+        closed together.
+    column_names : list of str
+        The column names for the pair separations file.
+    fit_labels : list of str
+        The labels of the fits to create files for.
+
+    Returns
+    -------
+    tuple
+        A `csv.writer` for the pair separations, and a dictionary of
+        `csv.writer`s for the information on each fit with the fit labels as
+        keys. The column headers have already been written out.
+
+    """
 
     csv_filename = data_dir / 'pair_separations_{}.csv'.format(data_dir.stem)
     vprint(f'Creating CSV file of separations for {data_dir.stem}'
            f' at {csv_filename}')
 
-    assert len(master_star_list[0]) == len(column_names)
-
-    with open(csv_filename, 'w') as csvfile:
-        csv_writer = csv.writer(csvfile, delimiter=',')
-        csv_writer.writerow(column_names)
-        for row in tqdm(master_star_list):
-            csv_writer.writerow(row)
+    csvfile = exit_stack.enter_context(open(csv_filename, 'w'))
+    separations_writer = csv.writer(csvfile, delimiter=',')
+    separations_writer.writerow(column_names)
 
     # Write out a series of CSV files containing information on the fits of
     # individual transitions for each star.
@@ -614,16 +903,16 @@ def write_csv(column_names):
     if not csv_fits_dir.exists():
         os.mkdir(csv_fits_dir)
     vprint(f'Writing information on fits to files in {csv_fits_dir}')
-    for transition in tqdm(transitions_list):
-        csv_filename = csv_fits_dir / '{}_{}.csv'.format(transition.label,
+    fits_writers = {}
+    for fit_label in fit_labels:
+        csv_filename = csv_fits_dir / '{}_{}.csv'.format(fit_label,
                                                          data_dir.stem)
 
-        with open(csv_filename, 'w') as csvfile:
-            csv_writer = csv.writer(csvfile, delimiter=',')
-            csv_writer.writerow(column_headers)
-            for fits_dict in master_fits_list:
-                csv_writer.writerow(fits_dict[transition.label].
-                                    getFitInformation())
+        csvfile = exit_stack.enter_context(open(csv_filename, 'w'))
+        fits_writers[fit_label] = csv.writer(csvfile, delimiter=',')
+        fits_writers[fit_label].writerow(column_headers)
+
+    return separations_writer, fits_writers
 
 
 def create_pair_offset_plots(plot_dir):
@@ -637,168 +926,177 @@ def create_pair_offset_plots(plot_dir):
 
     """
 
-    for pair in tqdm(pairs_list):
-        for order_num in pair.ordersToMeasureIn:
-            pair_label = '_'.join((pair.label, str(order_num)))
-            vprint(f'Creating plot for pair {pair_label}')
-            fitted_pairs = []
-            date_obs = []
-            for pair_dict in master_star_dict.values():
-                if pair_dict[pair_label] is not None:
-                    # Grab the associated pair from each observation.
-                    fitted_pairs.append(pair_dict[pair_label])
-                    # Grab the observation date.
-                    date_obs.append(pair_dict[pair_label][0].dateObs)
-                else:
-                    # If a particular pair isn't available, just continue.
-                    continue
-
-            offsets, errors = [], []
-            for fit_pair in fitted_pairs:
-                offsets.append(wave2vel(fit_pair[0].mean, fit_pair[1].mean))
-                error = np.sqrt(fit_pair[0].meanErrVel ** 2 +
-                                fit_pair[1].meanErrVel ** 2)
-                if np.isnan(error):
-                    print(fit_pair[0].meanErrVel)
-                    print(fit_pair[1].meanErrVel)
-                    raise ValueError
-                errors.append(error)
-
-            offsets = np.array(offsets) * u.m / u.s
-            errors = np.array(errors) * u.m / u.s
-            folded_dates = [obs_date.replace(year=2000) for obs_date
-                            in date_obs]
-
-            weights = 1 / errors ** 2
-            weighted_mean = np.average(offsets, weights=weights)
-
-            vprint(f"Weighted mean for {pair_label} is"
-                   " {weighted_mean:.2f}")
-
-            normalized_offsets = offsets - weighted_mean
-#            chi_squared = sum((normalized_offsets / errors) ** 2)
-
-            weighted_mean_err = 1 / np.sqrt(sum(weights))
-
-            # Find the indices between dates of changes to make subsets of
-            # points.
-            date_indices = []
-            for value in dates_of_change.values():
-                date_indices.append(date2index(value['x'], date_obs))
-
-            chi_squared_pre = sum((normalized_offsets[:date_indices[2]] /
-                                   errors[:date_indices[2]]) ** 2)
-            chi_squared_nu_pre = chi_squared_pre /\
-                (len(normalized_offsets[:date_indices[2]]) - 1)
-
-            chi_squared_post = sum((normalized_offsets[date_indices[2]:] /
-                                    errors[date_indices[2]:]) ** 2)
-            chi_squared_nu_post = chi_squared_post /\
-                (len(normalized_offsets[date_indices[2]:]) - 1)
-
-            plot_name = plot_dir / '{}.png'.format(pair_label)
-
-            fig, axes = plt.subplots(ncols=2, nrows=2,
-                                     tight_layout=True,
-                                     figsize=(10, 8),
-                                     sharey='all')  # Share y-axis among all.
-            fig.autofmt_xdate()
-            (ax1, ax2), (ax3, ax4) = axes
-            for ax in (ax1, ax2, ax3, ax4):
-                ax.set_ylabel(r'$\Delta v_{\mathrm{sep}}\mathrm{ (m/s)}$')
-                ax.axhline(y=0, **weighted_mean_params)
-                ax.axhline(y=weighted_mean_err,
-                           **weighted_err_params)
-                ax.axhline(y=-weighted_mean_err,
-                           **weighted_err_params)
-            for key, value in dates_of_change.items():
-                ax3.axvline(label=key, **value)
-
-            # Set up axis 1.
-            ax1.xaxis.set_major_locator(ticker.MultipleLocator(base=10))
-            ax1.xaxis.set_minor_locator(ticker.MultipleLocator(base=2))
-            ax1.grid(which='major', axis='y', color='Gray', alpha=0.6,
-                     linestyle='--')
-            ax1.grid(which='major', axis='x', color='Gray', alpha=0.6,
-                     linestyle='-')
-            ax1.grid(which='minor', axis='x', color='Gray', alpha=0.6,
-                     linestyle=':')
-            # Plot pre-fiber change observations.
-            # TODO: This all needs to take into account the three possible
-            # cases for pre-/post-fiber change distributions.
-            pre_fiber_change_obs = len(offsets[:date_indices[2]])
-            x_values = [x for x in range(pre_fiber_change_obs)]
+    # The observations are in chronological order, so find where the dates of
+    # changes fall among all of them once. For each pair the indices are then
+    # just the number of observations it was measured in before each date.
+    change_indices = []
+    for value in dates_of_change.values():
+        change_index = date2index(value['x'], obs_dates)
+        change_indices.append(len(obs_dates) if change_index is None
+                              else change_index)
+
+    # Work out the statistics for all the pairs at once, as columns. Pairs
+    # not measured in an observation have NaN values, so are given zero
+    # weight and left out of the sums.
+    all_measured = ~np.isnan(pair_separation_errors)
+    all_weights = np.zeros_like(pair_separation_errors)
+    all_weights[all_measured] = 1 / pair_separation_errors[all_measured] ** 2
+    weight_sums = all_weights.sum(axis=0)
+
+    weighted_means = np.nansum(pair_separations * all_weights,
+                               axis=0) / weight_sums
+    weighted_mean_errs = 1 / np.sqrt(weight_sums)
+
+    all_normalized_offsets = pair_separations - weighted_means
+    squared_residuals = (all_normalized_offsets /
+                         pair_separation_errors) ** 2
+
+    # Split the observations at the date the fibers were changed.
+    fiber_change_index = change_indices[2]
+    chi_squared_nu_pre = np.nansum(
+        squared_residuals[:fiber_change_index], axis=0) /\
+        (all_measured[:fiber_change_index].sum(axis=0) - 1)
+    chi_squared_nu_post = np.nansum(
+        squared_residuals[fiber_change_index:], axis=0) /\
+        (all_measured[fiber_change_index:].sum(axis=0) - 1)
+
+    # Create the figure once and clear its axes for each pair, rather than
+    # creating and closing a new figure every time.
+    fig, axes = plt.subplots(ncols=2, nrows=2,
+                             tight_layout=True,
+                             figsize=(10, 8),
+                             sharey='all')  # Share y-axis among all.
+    (ax1, ax2), (ax3, ax4) = axes
+
+    for column, labels in enumerate(tqdm(pair_labels)):
+        pair_label = labels[1]
+        vprint(f'Creating plot for pair {pair_label}')
+        # Grab the observations in which this pair was measured.
+        measured = all_measured[:, column]
+        offsets = pair_separations[measured, column]
+        errors = pair_separation_errors[measured, column]
+        date_obs = [obs_date for obs_date, was_measured
+                    in zip(obs_dates, measured) if was_measured]
+        folded_dates = [obs_date.replace(year=2000) for obs_date
+                        in date_obs]
+
+        weighted_mean = weighted_means[column]
+
+        vprint(f"Weighted mean for {pair_label} is"
+               f" {weighted_mean:.2f}")
+
+        normalized_offsets = all_normalized_offsets[measured, column]
+
+        weighted_mean_err = weighted_mean_errs[column]
+
+        # Find the indices between dates of changes to make subsets of
+        # points.
+        date_indices = []
+        for change_index in change_indices:
+            date_index = np.count_nonzero(measured[:change_index])
+            date_indices.append(date_index if date_index < len(offsets)
+                                else None)
+
+        plot_name = plot_dir / '{}.png'.format(pair_label)
+
+        for ax in (ax1, ax2, ax3, ax4):
+            ax.clear()
+            # Clearing doesn't reset the data limits, and the horizontal lines
+            # drawn first would otherwise keep the previous pair's x-limits.
+            ax.relim()
+        fig.autofmt_xdate()
+        for ax in (ax1, ax2, ax3, ax4):
+            ax.set_ylabel(r'$\Delta v_{\mathrm{sep}}\mathrm{ (m/s)}$')
+            ax.axhline(y=0, **weighted_mean_params)
+            ax.axhline(y=weighted_mean_err,
+                       **weighted_err_params)
+            ax.axhline(y=-weighted_mean_err,
+                       **weighted_err_params)
+        for key, value in dates_of_change.items():
+            ax3.axvline(label=key, **value)
+
+        # Set up axis 1.
+        ax1.xaxis.set_major_locator(ticker.MultipleLocator(base=10))
+        ax1.xaxis.set_minor_locator(ticker.MultipleLocator(base=2))
+        ax1.grid(which='major', axis='y', color='Gray', alpha=0.6,
+                 linestyle='--')
+        ax1.grid(which='major', axis='x', color='Gray', alpha=0.6,
+                 linestyle='-')
+        ax1.grid(which='minor', axis='x', color='Gray', alpha=0.6,
+                 linestyle=':')
+        # Plot pre-fiber change observations.
+        # TODO: This all needs to take into account the three possible
+        # cases for pre-/post-fiber change distributions.
+        pre_fiber_change_obs = len(offsets[:date_indices[2]])
+        x_values = [x for x in range(pre_fiber_change_obs)]
+        ax1.errorbar(x=x_values,
+                     y=normalized_offsets[:date_indices[2]],
+                     yerr=errors[:date_indices[2]],
+                     label=r'$\chi^2_\nu=${:.3f}'.format(
+                             chi_squared_nu_pre[column]),
+                     **style_params_pre)
+        # Plot post-fiber change observations.
+        if date_indices[2] is not None:
+            x_values = [x + pre_fiber_change_obs for x in
+                        range(len(offsets[date_indices[2]:]))]
             ax1.errorbar(x=x_values,
-                         y=normalized_offsets[:date_indices[2]],
-                         yerr=errors[:date_indices[2]],
+                         y=normalized_offsets[date_indices[2]:],
+                         yerr=errors[date_indices[2]:],
                          label=r'$\chi^2_\nu=${:.3f}'.format(
-                                 chi_squared_nu_pre.value),
-                         **style_params_pre)
-            # Plot post-fiber change observations.
-            if date_indices[2] is not None:
-                x_values = [x + pre_fiber_change_obs for x in
-                            range(len(offsets[date_indices[2]:]))]
-                ax1.errorbar(x=x_values,
-                             y=normalized_offsets[date_indices[2]:],
-                             yerr=errors[date_indices[2]:],
-                             label=r'$\chi^2_\nu=${:.3f},'
-                                   r' $\mu=${:.2f}'.format(
-                                     chi_squared_nu_post.value,
-                                     ),
-                             **style_params_post)
-
-            for index, key in zip(date_indices, dates_of_change.keys()):
-                if index is not None:
-                    ax1.axvline(x=index - 0.5,
-                                linestyle=dates_of_change[key]['linestyle'],
-                                color=dates_of_change[key]['color'])
-            ax1.legend(loc='upper right', framealpha=0.6)
-
-            # Set up axis 2.
-            ax2.set_xlabel('Count')
-            try:
-                ax2.hist(normalized_offsets.value,
-                         orientation='horizontal', color='White',
-                         edgecolor='Black')
-            except ValueError:
-                print(fit_pair[0].meanErrVel)
-                print(fit_pair[1].meanErrVel)
-                print(offsets)
-                print(errors)
-                print(weights)
-                raise
-
-            # Set up axis 3.
-            ax3.set_xlim(**date_plot_range)
-            ax3.xaxis.set_major_locator(mdates.YearLocator(base=1,
-                                                           month=1, day=1))
-            ax3.xaxis.set_minor_locator(mdates.YearLocator(base=1,
-                                                           month=6, day=1))
-            ax3.xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
-            ax3.grid(which='major', axis='x', color='Gray', alpha=0.7,
-                     linestyle='--')
-            ax3.grid(which='minor', axis='x', color='LightGray', alpha=0.9,
-                     linestyle=':')
-
-            ax3.errorbar(x=date_obs, y=normalized_offsets,
-                         yerr=errors, **style_params_pre)
-
-            # Set up axis 4.
-            ax4.set_xlim(**folded_date_range)
-            ax4.xaxis.set_major_locator(mdates.MonthLocator())
-            ax4.xaxis.set_minor_locator(mdates.MonthLocator(bymonthday=15))
-            ax4.xaxis.set_major_formatter(mdates.DateFormatter('%m'))
-
-            ax4.grid(which='major', axis='x', color='Gray', alpha=0.7,
-                     linestyle='--')
-            ax4.grid(which='minor', axis='x', color='LightGray', alpha=1,
-                     linestyle=':')
-
-            ax4.errorbar(x=folded_dates, y=normalized_offsets,
-                         yerr=errors, **style_params_pre)
-
-            fig.savefig(str(plot_name))
-            plt.close(fig)
+                                 chi_squared_nu_post[column]),
+                         **style_params_post)
+
+        for index, key in zip(date_indices, dates_of_change.keys()):
+            if index is not None:
+                ax1.axvline(x=index - 0.5,
+                            linestyle=dates_of_change[key]['linestyle'],
+                            color=dates_of_change[key]['color'])
+        ax1.legend(loc='upper right', framealpha=0.6)
+
+        # Set up axis 2.
+        ax2.set_xlabel('Count')
+        try:
+            ax2.hist(normalized_offsets,
+                     orientation='horizontal', color='White',
+                     edgecolor='Black')
+        except ValueError:
+            print(offsets)
+            print(errors)
+            print(all_weights[measured, column])
+            raise
+
+        # Set up axis 3.
+        ax3.set_xlim(**date_plot_range)
+        ax3.xaxis.set_major_locator(mdates.YearLocator(base=1,
+                                                       month=1, day=1))
+        ax3.xaxis.set_minor_locator(mdates.YearLocator(base=1,
+                                                       month=6, day=1))
+        ax3.xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
+        ax3.grid(which='major', axis='x', color='Gray', alpha=0.7,
+                 linestyle='--')
+        ax3.grid(which='minor', axis='x', color='LightGray', alpha=0.9,
+                 linestyle=':')
+
+        ax3.errorbar(x=date_obs, y=normalized_offsets,
+                     yerr=errors, **style_params_pre)
+
+        # Set up axis 4.
+        ax4.set_xlim(**folded_date_range)
+        ax4.xaxis.set_major_locator(mdates.MonthLocator())
+        ax4.xaxis.set_minor_locator(mdates.MonthLocator(bymonthday=15))
+        ax4.xaxis.set_major_formatter(mdates.DateFormatter('%m'))
+
+        ax4.grid(which='major', axis='x', color='Gray', alpha=0.7,
+                 linestyle='--')
+        ax4.grid(which='minor', axis='x', color='LightGray', alpha=1,
+                 linestyle=':')
+
+        ax4.errorbar(x=folded_dates, y=normalized_offsets,
+                     yerr=errors, **style_params_pre)
+
+        fig.savefig(str(plot_name))
+
+    plt.close(fig)
 
 
 def create_airmass_plots(transition_plots_dir):
@@ -1133,150 +1431,72 @@ if __name__ == '__main__':
             or args.create_fit_plots:
 
         # Search for pickle files in the given directory.
-        search_str = str(data_dir)+f'/HARPS*/pickles_{args.suffix}/*fits.lzma'
+        # Sort the files so the observations are in chronological order.
+        search_str = f'HARPS*/pickles_{args.suffix}/*fits.lzma'
         vprint(f'Searching for pickle files using string: {search_str}')
-        pickle_files = [Path(path) for path in glob(search_str)]
-
-        # dictionary with entries per observation
-        # entries consist of dictionary with entries of pairs made from fits
-
-        # Set up the master dictionary to contain sub-entries per observation.
-        master_star_dict = {}
-
-        obs_name_re = re.compile('HARPS.*_e2ds_A')
-
-        # Create some lists to hold all the results for saving out as a CSV
-        # file:
-        master_star_list = []
-        master_fits_list = []
-        for pickle_file in tqdm(pickle_files):
-
-            # Match the part of the pickle filename that is the observation
-            # name.
-            obs_name = obs_name_re.match(pickle_file.stem).group()
-
-            tqdm.write('Analyzing results from {}'.format(obs_name))
-            with lzma.open(pickle_file, 'rb') as f:
-                fits_list = pickle.loads(f.read())
-
-            # Set up a dictionary to map fits in this observation to
-            # transitions:
-            fit_labels = []
-            for transition in transitions_list:
-                for order_num in transition.ordersToFitIn:
-                    fit_labels.append(f'{transition.label}_{order_num}')
-            fits_dict = {}
-            for fit, label in zip(fits_list, fit_labels):
-                if fit is not None:
-                    assert fit.label == label, f'{fit.label} does not match'\
-                                                'generated label: {label}'
-                    fits_dict[label] = fit
-                else:
-                    fits_dict[label] = None
-#            fits_dict = {fit.label: fit for fit in fits_list}
-            master_fits_list.append(fits_dict)
-
-            # This can be used to remake plots for individual fits without
-            # rerunning the fitting process in case the plot visual format
-            # changes.
-            if args.create_fit_plots:
-                closeup_dir = data_dir /\
-                    '{}/plots_{}/close_up'.format(obs_name, args.suffix)
-                context_dir = data_dir /\
-                    '{}/plots_{}/context'.format(obs_name, args.suffix)
-                tqdm.write('Creating plots of fits.')
-
-                for transition in tqdm(transitions_list):
-                    for order_num in transition.ordersToFitIn:
-                        plot_closeup = closeup_dir /\
-                            f'{obs_name}_{transition.label}'\
-                            f'_{order_num}_close.png'
-                        plot_context = context_dir /\
-                            f'{obs_name}_{transition.label}'\
-                            f'_{order_num}_context.png'
-                        vprint('Creating plots at:')
-                        vprint(plot_closeup)
-                        vprint(plot_context)
-                        tr_label = f'{transition.label}_{order_num}'
-                        if fits_dict[tr_label] is not None:
-                            fits_dict[tr_label].plotFit(plot_closeup,
-                                                        plot_context)
-                        else:
-                            err_msg = f'The fit for {tr_label} failed for'\
-                                      f' observation {obs_name}, and'\
-                                      ' will need to be re-reduced to be'\
-                                      ' created.'
-                            tqdm.write(err_msg)
-
-            pairs_dict = {}
-            for fit in fits_list:
-                # Iterate through the list until a non-None observation is
-                # found.
-                try:
-                    separations_list = [obs_name, fit.dateObs.
-                                        isoformat(timespec='milliseconds')]
-                    break
-                except AttributeError:
-                    # If the fit is None, this will catch it.
-                    pass
-
-            column_names = ['Observation', 'Time']
-            for pair in pairs_list:
-                for order_num in pair.ordersToMeasureIn:
-                    pair_label = '_'.join((pair.label, str(order_num)))
-                    column_names.extend([pair_label, pair_label + '_err'])
-                    high_E_label = '_'.join((pair._higherEnergyTransition.
-                                            label, str(order_num)))
-                    low_E_label = '_'.join((pair._lowerEnergyTransition.
-                                            label, str(order_num)))
-
-                    # Check that fits for both transitions exist.
-                    if fits_dict[high_E_label] and fits_dict[low_E_label]:
-                        fits_pair = [fits_dict[high_E_label],
-                                     fits_dict[low_E_label]]
-
-                        assert fits_pair[0].order == fits_pair[1].order,\
-                            f"Orders don't match for {fits_pair}"
-                        if np.isnan(fits_pair[0].meanErrVel) or \
-                           np.isnan(fits_pair[1].meanErrVel):
-                            # Similar to above, fill in list with placeholder
-                            # values.
-                            vprint(f'{pair.label} in {obs_name} has a'
-                                   ' NaN velocity offset!')
-                            vprint(fits_pair[0].meanErrVel)
-                            vprint(fits_pair[1].meanErrVel)
-                            separations_list.extend(['NaN', ' NaN'])
-                            pairs_dict[pair_label] = None
-                            continue
-
-                    else:
-                        # Measurement of one or both transition doesn't
-                        # exist, so skip it (but fill in the list to prevent
-                        # getting out of sync)
-                        separations_list.extend(['N/A', ' N/A'])
-                        pairs_dict[pair_label] = None
-                        continue
-
-                    # If both transitions have non-NaN values, add the velocity
-                    # separation and error:
-                    pairs_dict[pair_label] = fits_pair
-
-                    velocity_separation = wave2vel(fits_pair[0].mean,
-                                                   fits_pair[1].mean)
-                    error = np.sqrt(fits_pair[0].meanErrVel ** 2 +
-                                    fits_pair[1].meanErrVel ** 2)
-                    separations_list.extend([velocity_separation.value,
-                                             error.value])
+        pickle_files = sorted(data_dir.glob(search_str))
+
+        # The observation dates, and the separations of each pair and their
+        # errors in each observation (as rows), to use for the plots.
+        obs_dates, pair_separations, pair_separation_errors = [], [], []
+
+        # The labels of the fits and pairs are the same for every
+        # observation, so only work them out once.
+        fit_labels = get_fit_labels(transitions_list)
+        pair_labels = get_pair_labels(pairs_list)
+
+        # The names of the columns in the CSV file of pair separations.
+        column_names = ['Observation', 'Time']
+        for _, pair_label, _, _ in pair_labels:
+            column_names.extend([pair_label, pair_label + '_err'])
+
+        csv_files = ExitStack()
+        if args.write_csv:
+            tqdm.write('Writing out CSV files.')
+            separations_writer, fits_writers = open_csv_files(csv_files,
+                                                              column_names,
+                                                              fit_labels)
+
+        if args.create_fit_plots:
+            tqdm.write('Creating plots of fits.')
+            fit_plots_dir_name = f'plots_{args.suffix}'
+        else:
+            fit_plots_dir_name = None
+
+        # Reading the pickle files is independent for each observation (and
+        # dominated by decompressing them), so do it in parallel. Results are
+        # handled as they come in, so they don't all need to be kept around
+        # for writing out at the end.
+        results = p_imap(partial(read_pickle_file,
+                                 fit_labels=fit_labels,
+                                 pair_labels=pair_labels,
+                                 fit_plots_dir_name=fit_plots_dir_name,
+                                 write_csv=args.write_csv,
+                                 verbose=args.verbose),
+                         pickle_files)
+
+        for obs_name, obs_date, fits_info, separations, separation_errors,\
+                separations_list in results:
 
             # This is for the script to use.
-            master_star_dict[obs_name] = pairs_dict
+            obs_dates.append(obs_date)
+            pair_separations.append(separations)
+            pair_separation_errors.append(separation_errors)
             if args.write_csv:
                 # This is to be written out.
-                master_star_list.append(separations_list)
-
-    if args.write_csv:
-        tqdm.write('Writing out CSV files.')
-        write_csv(column_names)
+                assert len(separations_list) == len(column_names)
+                separations_writer.writerow(separations_list)
+                for fit_label, fit_info in fits_info.items():
+                    fits_writers[fit_label].writerow(fit_info)
+
+        csv_files.close()
+
+        # Stack the rows into arrays of shape (observations, pairs), so that
+        # each pair's values across all observations are a single column.
+        pair_separations = np.array(pair_separations).reshape(
+            len(obs_dates), len(pair_labels))
+        pair_separation_errors = np.array(pair_separation_errors).reshape(
+            len(obs_dates), len(pair_labels))
 
     if args.create_pair_offset_plots:
         # Create the plots for each pair of transitions
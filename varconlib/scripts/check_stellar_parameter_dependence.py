@@ -11,19 +11,20 @@ not.
 """
 
 import argparse
+from functools import partial
 from inspect import signature
-from itertools import tee
 from pathlib import Path
 import pickle
 import sys
 
 import h5py
 import hickle
+from matplotlib.collections import LineCollection
 from matplotlib.gridspec import GridSpec
 import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
 import numpy as np
-import numpy.ma as ma
+from p_tqdm import p_map
 from scipy.optimize import curve_fit
 from tqdm import tqdm
 import unyt as u
@@ -33,16 +34,251 @@ import varconlib.fitting.fitting as fit
 from varconlib.scripts.multi_fit_stars import plot_data_points
 
 
-def pairwise(iterable):
-    """Return successive pairs from an iterable.
+def get_bin_indices(values, bin_edges):
+    """Return the indices of the values which fall in each of a series of bins.
 
-    E.g., s -> (s0,s1), (s1,s2), (s2, s3), ...
+    Parameters
+    ----------
+    values : `np.ndarray`
+        The values to sort into bins.
+    bin_edges : array-like of floats
+        The edges of the bins, in increasing order. Values equal to an edge are
+        included in the bins on both sides of it.
+
+    Returns
+    -------
+    list of `np.ndarray`
+        A list of integer arrays, one for each bin, holding the indices in
+        `values` of the values within that bin in increasing order.
+
+    """
+
+    order = np.argsort(values, kind='stable')
+    sorted_values = values[order]
+    bin_edges = np.asarray(bin_edges)
+    starts = np.searchsorted(sorted_values, bin_edges[:-1], side='left')
+    stops = np.searchsorted(sorted_values, bin_edges[1:], side='right')
+    # Keep the indices in each bin in their original order, so values are
+    # selected in the same order regardless of how they are binned.
+    return [np.sort(order[start:stop]) for start, stop in zip(starts, stops)]
+
+
+def update_running_stats(count, mean, m2, values):
+    """Add a set of values to running per-bin statistics, in place.
+
+    This uses Welford's algorithm so the mean and standard deviation of each
+    bin can be found without keeping every value. NaN values are ignored.
+
+    Parameters
+    ----------
+    count : `np.ndarray` of ints
+        The number of values added so far in each bin.
+    mean : `np.ndarray` of floats
+        The running mean of the values in each bin.
+    m2 : `np.ndarray` of floats
+        The running sum of squared differences from the mean in each bin.
+    values : array-like
+        The new values to add, one per bin.
+
+    """
+
+    values = np.asarray(values, dtype=float)
+    finite = np.isfinite(values)
+    count[finite] += 1
+    delta = values[finite] - mean[finite]
+    mean[finite] += delta / count[finite]
+    m2[finite] += delta * (values[finite] - mean[finite])
+
+
+def get_line_segments(x, y):
+    """Return the runs of finite points in a line as separate segments.
+
+    This splits a line at any NaN values in the same places `plt.plot` would
+    break it, so that many such lines can be drawn as a single
+    `LineCollection`.
+
+    Parameters
+    ----------
+    x, y : array-like
+        The coordinates of the points in the line.
+
+    Returns
+    -------
+    list of `np.ndarray`
+        A list of arrays with dimensions (n, 2), one for each run of
+        consecutive points where both `x` and `y` are finite.
+
+    """
+
+    points = np.column_stack((x, y))
+    finite = np.isfinite(points).all(axis=1)
+    # Find where runs of finite points start and stop.
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], finite, [0]))))
+    return [points[start:stop] for start, stop in zip(edges[::2],
+                                                       edges[1::2])]
+
+
+def find_transition_sigma_sys(offsets, eotwms, eotms, x_data_full,
+                              model_func, model_jac, bin_dict, nbins=None,
+                              min_bin_size=7):
+    """Find sigma_sys in bins of each stellar parameter for one transition.
+
+    Parameters
+    ----------
+    offsets, eotwms, eotms : `np.ndarray` with dimensions (2, n_stars)
+        The offsets of each star for this transition, and their errors on the
+        weighted mean and on the mean, in m/s. The first axis is for pre- and
+        post- fiber change values: 0 = pre, 1 = post.
+    x_data_full : `np.ndarray` with dimensions (3, n_stars)
+        The temperatures, metallicities, and surface gravities of all the stars.
+    model_func, model_jac : callable
+        The model to fit to the offsets, and its Jacobian.
+    bin_dict : dict
+        A dictionary of bin edges with the names of the stellar parameters as
+        keys, in the same order as the rows of `x_data_full`.
+
+    Optional
+    --------
+    nbins : int
+        If given, use this many bins with equal numbers of stars in them
+        instead of the bins in `bin_dict`.
+    min_bin_size : int
+        Bins with fewer stars than this are skipped. Default is 7.
+
+    Returns
+    -------
+    list of dict
+        A list with a dictionary for each era containing the sigma_sys values,
+        standard deviations, and bin midpoints for each stellar parameter.
 
     """
 
-    a, b = tee(iterable)
-    next(b, None)
-    return zip(a, b)
+    # Figure out how many parameters the model function takes, so we know how
+    # many to dynamically give it later. Only the constant term of the initial
+    # guess changes between fits, so the rest can stay zero throughout.
+    n_model_params = len(signature(model_func).parameters) - 1
+    beta0_arr = np.zeros(n_model_params)
+    # The residuals in each bin are compared against a single value.
+    dof_params = 1
+
+    era_results = []
+    for era in range(offsets.shape[0]):
+
+        vprint(20 * '=')
+        vprint(f'Working on era {era}.')
+        mean = np.nanmean(offsets[era])
+
+        # Select only the stars with measurements of this transition:
+        valid = ~np.isnan(offsets[era])
+        era_offsets = offsets[era, valid]
+        vprint(f'Median of offsets is {np.nanmedian(era_offsets)} m/s')
+
+        era_eotwms = eotwms[era, ~np.isnan(eotwms[era])]
+
+        # Use the same mask as for the offsets.
+        era_eotms = eotms[era, valid]
+        # Create an error array which uses the greater of the error on
+        # the mean or the error on the weighted mean.
+        err_array = np.maximum(era_eotwms, era_eotms)
+
+        vprint(f'Mean is {np.mean(era_offsets)} m/s')
+        weighted_mean = np.average(era_offsets, weights=err_array**-2)
+        vprint(f'Weighted mean is {weighted_mean} m/s')
+
+        # Select from the stellar parameter arrays with the same mask so
+        # that everything stays in sync.
+        x_data = x_data_full[:, valid]
+
+        # Update the initial guess for this run of fitting.
+        beta0_arr[0] = float(mean)
+        vprint(beta0_arr)
+
+        popt, pcov = curve_fit(model_func, x_data, era_offsets,
+                               sigma=err_array,
+                               p0=beta0_arr,
+                               jac=model_jac,
+                               absolute_sigma=True,
+                               method='lm', maxfev=10000)
+
+        model_values = model_func(x_data, *popt)
+        residuals = era_offsets - model_values
+
+        # Iterate over binned segments of the data to find what additional
+        # systematic error is needed to get a chi^2 of ~1.
+        sigma_sys_dict = {}
+        for row, name in enumerate(bin_dict.keys()):
+            bin_edges = bin_dict[name]
+            if nbins:
+                # Use quantiles to get bins with the same number of elements
+                # in them.
+                vprint(f'Generating {nbins} bins.')
+                bin_edges = np.quantile(x_data[row],
+                                        np.linspace(0, 1, nbins+1),
+                                        interpolation='nearest')
+            # Find which of the stars with measurements of this transition
+            # fall in each bin.
+            bin_indices = get_bin_indices(x_data[row], bin_edges)
+            bin_sizes = np.array([len(in_bin) for in_bin in bin_indices])
+            bin_numbers = np.repeat(np.arange(len(bin_indices)), bin_sizes)
+            in_bins = np.concatenate(bin_indices)
+
+            # Find the additional error (to the nearest cm/s) needed to bring
+            # chi^2_nu down to 1 for all the bins with enough stars at once.
+            use = (bin_sizes >= min_bin_size)[bin_numbers]
+            sigma_sys_array = fit.find_binned_sigma_sys(
+                residuals[in_bins[use]], err_array[in_bins[use]],
+                bin_numbers[use], len(bin_indices), dof_params, step=0.01)
+
+            sigma_sys_list = []
+            sigma_list = []
+            bin_mid_list = []
+            for lower, upper, in_bin, sigma_sys in zip(bin_edges[:-1],
+                                                       bin_edges[1:],
+                                                       bin_indices,
+                                                       sigma_sys_array):
+                bin_lims = (lower, upper)
+                bin_mid_list.append((lower + upper) / 2)
+                num_points = len(in_bin)
+                vprint(f'{num_points} values in bin ({lower},{upper})')
+                if num_points < min_bin_size:
+                    vprint('Skipping this bin!')
+                    sigma_list.append(np.nan)
+                    sigma_sys_list.append(np.nan)
+                    continue
+                residuals_copy = residuals[in_bin]
+                errs_copy = err_array[in_bin]
+
+                sigma_sys_list.append(sigma_sys)
+                sigma = np.std(residuals_copy)
+                sigma_list.append(sigma)
+                # tqdm.write(f'sigma_sys is {sigma_sys:.3f}')
+                # tqdm.write(f'chi^2_nu is {chi_squared_nu}')
+                if sigma_sys / sigma > 1.2:
+                    print('---')
+                    print(bin_lims)
+                    print(in_bin)
+                    print(x_data[1])
+                    print(residuals)
+                    print(n_model_params)
+                    print(dof_params)
+                    print(residuals_copy)
+                    print(errs_copy)
+                    print(sigma)
+                    print(sigma_sys)
+                    # This runs in a worker process, so raise an exception
+                    # (which is passed back to the main process) rather than
+                    # exiting, which would leave the pool waiting forever.
+                    raise RuntimeError(f'sigma_sys ({sigma_sys}) is more than'
+                                       f' 1.2 times sigma ({sigma}) in bin'
+                                       f' {bin_lims} for {name}.')
+
+            sigma_sys_dict[f'{name}_sigma_sys'] = sigma_sys_list
+            sigma_sys_dict[f'{name}_sigma'] = sigma_list
+            sigma_sys_dict[f'{name}_bin_mids'] = bin_mid_list
+
+        era_results.append(sigma_sys_dict)
+
+    return era_results
 
 
 def create_comparison_figure(ylims=None,
@@ -165,12 +401,16 @@ def main():
     # Define the model to use.
     if args.linear:
         model_func = fit.linear_model
+        model_jac = fit.linear_model_jac
     elif args.quadratic:
         model_func = fit.quadratic_model
+        model_jac = fit.quadratic_model_jac
     elif args.cross_term:
         model_func = fit.cross_term_model
+        model_jac = fit.cross_term_model_jac
     elif args.quadratic_magnitude:
         model_func = fit.quadratic_mag_model
+        model_jac = fit.quadratic_mag_model_jac
 
     # model_func = fit.quadratic_model
     model_name = '_'.join(model_func.__name__.split('_')[:-1])
@@ -179,35 +419,32 @@ def main():
     db_file = vcl.databases_dir / f'stellar_db_{model_name}_params.hdf5'
     # Load data from HDF5 database file.
     tqdm.write('Reading data from stellar database file...')
-    star_transition_offsets = u.unyt_array.from_hdf5(
-            db_file, dataset_name='star_transition_offsets')
-    star_transition_offsets_EotWM = u.unyt_array.from_hdf5(
-            db_file, dataset_name='star_transition_offsets_EotWM')
-    star_transition_offsets_EotM = u.unyt_array.from_hdf5(
-            db_file, dataset_name='star_transition_offsets_EotM')
-    star_temperatures = u.unyt_array.from_hdf5(
-            db_file, dataset_name='star_temperatures')
-
     with h5py.File(db_file, mode='r') as f:
 
+        # Read the offsets and their errors (all in m/s) and the temperatures
+        # (in K) straight into plain arrays from the one open file, rather than
+        # having unyt reopen it for each dataset, so no units are carried
+        # through the fitting.
+        star_transition_offsets = f['star_transition_offsets'][()]
+        star_transition_offsets_EotWM = f['star_transition_offsets_EotWM'][()]
+        star_transition_offsets_EotM = f['star_transition_offsets_EotM'][()]
+        star_temperatures = f['star_temperatures'][()]
+
         star_metallicities = hickle.load(f, path='/star_metallicities')
-        star_magnitudes = hickle.load(f, path='/star_magnitudes')
         star_gravities = hickle.load(f, path='/star_gravities')
         column_dict = hickle.load(f, path='/transition_column_index')
-        star_names = hickle.load(f, path='/star_row_index')
+
+    # The stellar parameters are stored as column vectors; flatten them so they
+    # can be selected from with the same masks as the offsets.
+    star_temperatures = star_temperatures.reshape(-1)
+    star_metallicities = star_metallicities.reshape(-1)
+    star_gravities = star_gravities.reshape(-1)
 
     # Handle various fitting and plotting setup:
     eras = {'pre': 0, 'post': 1}
     param_dict = {'temp': 0, 'mtl': 1, 'logg': 2}
     plot_types = ('temp', 'mtl', 'logg')
 
-    params_list = []
-    # Figure out how many parameters the model function takes, so we know how
-    # many to dynamically give it later.
-    num_params = len(signature(model_func).parameters)
-    for i in range(num_params - 1):
-        params_list.append(0.)
-
     # Set up the figure with subplots.
     comp_fig, axes_dict = create_comparison_figure(ylims=None)
 
@@ -253,236 +490,82 @@ def main():
                     ax.axvline(x=limit, color='Green',
                                alpha=0.6, zorder=1)
 
-    # Create an array to store all the individual sigma_sys values in in order
-    # to get the means and STDs for each bin.
-    row_len = len(labels)
-    temp_col_len = len(bin_dict['temp']) - 1
-    metal_col_len = len(bin_dict['mtl']) - 1
-    logg_col_len = len(bin_dict['logg']) - 1
-
+    # Keep running statistics of the individual sigma_sys values in order to
+    # get the means and STDs for each bin.
     # First axis is for pre- and post- fiber change values: 0 = pre, 1 = post
-    temp_array = np.full([2, row_len, temp_col_len], np.nan)
-    metal_array = np.full([2, row_len, metal_col_len], np.nan)
-    logg_array = np.full([2, row_len, logg_col_len], np.nan)
-    full_arrays_dict = {key: value for key, value in zip(plot_types,
-                                                         (temp_array,
-                                                          metal_array,
-                                                          logg_array))}
-
-    for label_num, label in tqdm(enumerate(labels), total=len(labels)):
-
-        vprint(f'Analyzing {label}...')
-        # The column number to use for this transition:
+    counts_dict = {}
+    means_dict = {}
+    m2s_dict = {}
+    for name in plot_types:
+        shape = (2, len(bin_dict[name]) - 1)
+        counts_dict[name] = np.zeros(shape, dtype=int)
+        means_dict[name] = np.zeros(shape)
+        m2s_dict[name] = np.zeros(shape)
+
+    # Stack the stellar parameters into vertical slices for passing to model
+    # functions. Only the columns for stars with a measurement need to be
+    # selected for each transition.
+    x_data_full = np.stack((star_temperatures, star_metallicities,
+                            star_gravities), axis=0)
+
+    # Each transition is independent of the others, so fit them in parallel,
+    # passing each process only the columns for its own transition.
+    cols = []
+    for label in labels:
         try:
-            col = column_dict[label]
+            cols.append(column_dict[label])
         except KeyError:
             print(f'Incorrect key given: {label}')
             sys.exit(1)
 
-        for time in tqdm(eras.keys()):
-
-            vprint(20 * '=')
-            vprint(f'Working on {time}-change era.')
-            mean = np.nanmean(star_transition_offsets[eras[time],
-                              :, col])
-
-            # First, create a masked version to catch any missing entries:
-            m_offsets = ma.masked_invalid(star_transition_offsets[
-                        eras[time], :, col])
-            m_offsets = m_offsets.reshape([len(m_offsets), 1])
-            # Then create a new array from the non-masked data:
-            offsets = u.unyt_array(m_offsets[~m_offsets.mask],
-                                   units=u.m/u.s)
-            vprint(f'Median of offsets is {np.nanmedian(offsets)}')
-
-            m_eotwms = ma.masked_invalid(star_transition_offsets_EotWM[
-                    eras[time], :, col])
-            m_eotwms = m_eotwms.reshape([len(m_eotwms), 1])
-            eotwms = u.unyt_array(m_eotwms[~m_eotwms.mask],
-                                  units=u.m/u.s)
-
-            m_eotms = ma.masked_invalid(star_transition_offsets_EotM[
-                    eras[time], :, col])
-            m_eotms = m_eotms.reshape([len(m_eotms), 1])
-            # Use the same mask as for the offsets.
-            eotms = u.unyt_array(m_eotms[~m_offsets.mask],
-                                 units=u.m/u.s)
-            # Create an error array which uses the greater of the error on
-            # the mean or the error on the weighted mean.
-            err_array = np.maximum(eotwms, eotms)
-
-            vprint(f'Mean is {np.mean(offsets)}')
-            weighted_mean = np.average(offsets, weights=err_array**-2)
-            vprint(f'Weighted mean is {weighted_mean}')
-
-            # Mask the various stellar parameter arrays with the same mask
-            # so that everything stays in sync.
-            temperatures = ma.masked_array(star_temperatures)
-            temps = temperatures[~m_offsets.mask]
-            metallicities = ma.masked_array(star_metallicities)
-            metals = metallicities[~m_offsets.mask]
-            magnitudes = ma.masked_array(star_magnitudes)
-            mags = magnitudes[~m_offsets.mask]
-            gravities = ma.masked_array(star_gravities)
-            loggs = gravities[~m_offsets.mask]
-
-            stars = ma.masked_array([key for key in
-                                     star_names.keys()]).reshape(
-                                         len(star_names.keys()), 1)
-            names = stars[~m_offsets.mask]
-
-            # Stack the stellar parameters into vertical slices
-            # for passing to model functions.
-            x_data = np.stack((temps, metals, loggs), axis=0)
-
-            # Create the parameter list for this run of fitting.
-            params_list[0] = float(mean)
-
-            beta0 = tuple(params_list)
-            vprint(beta0)
-
-            # Iterate over binned segments of the data to find what additional
-            # systematic error is needed to get a chi^2 of ~1.
-            arrays_dict = {name: array for name, array in
-                           zip(plot_types,
-                               (temps, metals, loggs))}
-
-            popt, pcov = curve_fit(model_func, x_data, offsets.value,
-                                   sigma=err_array.value,
-                                   p0=beta0,
-                                   absolute_sigma=True,
-                                   method='lm', maxfev=10000)
-
-            model_values = model_func(x_data, *popt)
-            residuals = offsets.value - model_values
-
-            if args.nbins:
-                nbins = int(args.nbins)
-                # Use quantiles to get bins with the same number of elements
-                # in them.
-                vprint(f'Generating {args.nbins} bins.')
-                bins = np.quantile(arrays_dict[name],
-                                   np.linspace(0, 1, nbins+1),
-                                   interpolation='nearest')
-                bin_dict[name] = bins
-
-            min_bin_size = 7
-            sigma_sys_dict = {}
-            num_params = 1
-            for name in tqdm(plot_types):
-                sigma_sys_list = []
-                sigma_list = []
-                bin_mid_list = []
-                bin_num = -1
-                for bin_lims in pairwise(bin_dict[name]):
-                    bin_num += 1
-                    lower, upper = bin_lims
-                    bin_mid_list.append((lower + upper) / 2)
-                    mask_array = ma.masked_outside(arrays_dict[name], *bin_lims)
-                    num_points = mask_array.count()
-                    vprint(f'{num_points} values in bin ({lower},{upper})')
-                    if num_points < min_bin_size:
-                        vprint('Skipping this bin!')
-                        sigma_list.append(np.nan)
-                        sigma_sys_list.append(np.nan)
-                        continue
-                    temps_copy = temps[~mask_array.mask]
-                    metals_copy = metals[~mask_array.mask]
-                    mags_copy = mags[~mask_array.mask]
-                    residuals_copy = residuals[~mask_array.mask]
-                    errs_copy = err_array[~mask_array.mask].value
-                    x_data_copy = np.stack((temps_copy, metals_copy, mags_copy),
-                                           axis=0)
-
-                    chi_squared_nu = fit.calc_chi_squared_nu(residuals_copy,
-                                                             errs_copy,
-                                                             num_params)
-                    sigma_sys_delta = 0.01
-                    sigma_sys = -sigma_sys_delta
-                    chi_squared_nu = np.inf
-                    variances = np.square(errs_copy)
-                    while chi_squared_nu > 1.0:
-                        sigma_sys += sigma_sys_delta
-                        variance_sys = np.square(sigma_sys)
-                        variances_iter = variances + variance_sys
-                        # err_iter = np.sqrt(np.square(errs_copy) +
-                        #                    np.square(sigma_sys))
-                        weights = 1 / variances_iter
-                        wmean, sum_weights = np.average(residuals_copy,
-                                                        weights=weights,
-                                                        returned=True)
-
-                        chi_squared_nu = fit.calc_chi_squared_nu(
-                            residuals_copy - wmean, np.sqrt(variances_iter),
-                            num_params)
-
-                    sigma_sys_list.append(sigma_sys)
-                    sigma = np.std(residuals_copy)
-                    sigma_list.append(sigma)
-                    # tqdm.write(f'sigma_sys is {sigma_sys:.3f}')
-                    # tqdm.write(f'chi^2_nu is {chi_squared_nu}')
-                    if sigma_sys / sigma > 1.2:
-                        print('---')
-                        print(bin_lims)
-                        print(mask_array)
-                        print(metals)
-                        print(residuals)
-                        print(n_params)
-                        print(num_params)
-                        print(residuals_copy)
-                        print(errs_copy)
-                        print(sigma)
-                        print(sigma_sys)
-                        sys.exit()
-
-                    # Store the result in the appropriate full array.
-                    full_arrays_dict[name][eras[time],
-                                           label_num, bin_num] = sigma_sys
-
-                sigma_sys_dict[f'{name}_sigma_sys'] = sigma_sys_list
-                sigma_sys_dict[f'{name}_sigma'] = sigma_list
-                sigma_sys_dict[f'{name}_bin_mids'] = bin_mid_list
-
-            # sigma = np.nanstd(residuals)
-
-            for plot_type, lims in zip(plot_types,
-                                       (temp_lims, mtl_lims, logg_lims)):
-                ax = axes_dict[f'{plot_type}_{time}']
-                ax.plot(sigma_sys_dict[f'{plot_type}_bin_mids'],
-                        sigma_sys_dict[f'{plot_type}_sigma_sys'],
-                        color='Black', alpha=0.15,
-                        zorder=2)
-                        # label=r'$\sigma_\mathrm{sys}$')
-                # ax.plot(sigma_sys_dict[f'{plot_type}_bin_mids'],
-                #         sigma_sys_dict[f'{plot_type}_sigma'],
-                #         color='Blue', alpha=0.3,
-                #         label=r'$\sigma$')
-                if args.label:
-                    ax.legend()
-
-                # ax.annotate(r'$\sigma_\mathrm{sys}$:'
-                #             f' {sys_err:.2f}',
-                #             (0.01, 0.99),
-                #             xycoords='axes fraction',
-                #             verticalalignment='top')
-                # ax.annotate(fr'$\chi^2_\nu$: {chi_squared_nu.value:.4f}'
-                #             '\n'
-                #             fr'$\sigma$: {sigma:.2f}',
-                #             (0.99, 0.99),
-                #             xycoords='axes fraction',
-                #             horizontalalignment='right',
-                #             verticalalignment='top')
-                # data = np.array(ma.masked_invalid(residuals).compressed())
+    results = p_map(partial(find_transition_sigma_sys,
+                            x_data_full=x_data_full,
+                            model_func=model_func,
+                            model_jac=model_jac,
+                            bin_dict=bin_dict,
+                            nbins=args.nbins),
+                    [star_transition_offsets[:, :, col] for col in cols],
+                    [star_transition_offsets_EotWM[:, :, col] for col in cols],
+                    [star_transition_offsets_EotM[:, :, col] for col in cols])
+
+    # Collect the sigma_sys lines for each subplot so they can be drawn as a
+    # single collection rather than one artist per transition.
+    segments_dict = {key: [] for key in axes_dict.keys()}
+
+    for era_results in results:
+        for time in eras.keys():
+            sigma_sys_dict = era_results[eras[time]]
+
+            # Add the results to the statistics for each bin.
+            for name in plot_types:
+                update_running_stats(counts_dict[name][eras[time]],
+                                     means_dict[name][eras[time]],
+                                     m2s_dict[name][eras[time]],
+                                     sigma_sys_dict[f'{name}_sigma_sys'])
+
+            for plot_type in plot_types:
+                segments_dict[f'{plot_type}_{time}'].extend(
+                    get_line_segments(
+                        sigma_sys_dict[f'{plot_type}_bin_mids'],
+                        sigma_sys_dict[f'{plot_type}_sigma_sys']))
+
+    for key, ax in axes_dict.items():
+        ax.add_collection(LineCollection(segments_dict[key],
+                                         colors='Black', alpha=0.15,
+                                         zorder=2))
+        ax.autoscale_view()
+        if args.label:
+            ax.legend()
 
     for time in eras.keys():
         for name in plot_types:
             ax = axes_dict[f'{name}_{time}']
-            means = []
-            stds = []
-            arr = full_arrays_dict[name]
-            for i in range(0, np.size(arr, 2)):
-                means.append(np.nanmean(arr[eras[time], :, i]))
-                stds.append(np.nanstd(arr[eras[time], :, i]))
+            counts = counts_dict[name][eras[time]]
+            # Bins with no values at all have no mean or STD.
+            with np.errstate(invalid='ignore', divide='ignore'):
+                means = np.where(counts > 0, means_dict[name][eras[time]],
+                                 np.nan)
+                stds = np.sqrt(m2s_dict[name][eras[time]] / counts)
             ax.errorbar(sigma_sys_dict[f'{name}_bin_mids'], means,
                         yerr=stds, color='Red', alpha=1,
                         marker='o', markersize=4, capsize=4,
@@ -194,7 +194,10 @@ def find_transitions_in_obs(obs_path):
         os.mkdir(outfile.parent)
     with lzma.open(outfile, 'wb') as f:
         vprint(f'Pickling and compressing list of fits at {outfile}')
-        f.write(pickle.dumps(fits_list))
+        # Pickle straight into the compressed file rather than building the
+        # whole pickle in memory first. Protocol 5 lets any NumPy arrays in
+        # the fits be written from their own buffers without extra copies.
+        pickle.dump(fits_list, f, protocol=5)
 
     # Create a plot to show locations of transitions on the CCD for this
     # observation.
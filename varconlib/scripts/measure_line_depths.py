@@ -47,9 +47,13 @@ raw_line_data = np.genfromtxt(str(purpleLineFile), delimiter=",",
                               skip_header=1,
                               dtype=(float, "U2", int, float, float))
 
+# Convert all the air wavelengths to vacuum at once.
+vacuum_wavelengths = conversions.air2vacMortonIAU(raw_line_data['f0']) *\
+    u.angstrom
+
 line_data = []
-for line in tqdm(raw_line_data):
-    wavelength = conversions.air2vacMortonIAU(line[0]) * u.angstrom
+for line, wavelength in tqdm(zip(raw_line_data, vacuum_wavelengths),
+                             total=len(raw_line_data)):
     element = str(line[1])
     ionization_state = line[2]
     low_energy = line[3]
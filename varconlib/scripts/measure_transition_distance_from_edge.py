@@ -16,6 +16,7 @@ import argparse
 from pathlib import Path
 import pickle
 
+import numpy as np
 from tqdm import tqdm
 import unyt as u
 
@@ -85,35 +86,42 @@ if args.test_transition:
 for transition in transitions:
     transition.orders_found_in = []
 
+# Keep the transitions' wavelengths in an array, so the ones in each order can
+# be found without comparing every transition to every order individually.
+transition_wavelengths = np.array([transition.wavelength.to(u.angstrom).value
+                                   for transition in transitions])
 
 for num, order in enumerate(wavelength_scale):
     if args.verbose:
         tqdm.write('\nOrder: {}'.format(num + 1))  # Off by one
         tqdm.write('transition       lower dist.     right dist.')
-    for transition in transitions:
-        if order[0] < transition.wavelength < order[-1]:
-            transition.orders_found_in.append(num + 1)
-            left_dist = wave2vel(transition.wavelength, order[0])
-            right_dist = wave2vel(transition.wavelength, order[-1])
-            if not hasattr(transition, 'first_order'):
-                transition.first_order = {}
-                transition.first_order['left_dist'] = left_dist.to(u.km/u.s)
-                transition.first_order['right_dist'] = right_dist.to(u.km/u.s)
-            elif hasattr(transition, 'first_order'):
-                transition.second_order = {}
-                transition.second_order['left_dist'] = left_dist.to(u.km/u.s)
-                transition.second_order['right_dist'] = right_dist.to(u.km/u.s)
-            if args.verbose:
-                if hasattr(transition, 'second_order'):
-                    tqdm.write('{}:   {:.2f}     {:.2f}'.format(
-                                transition.label,
-                                transition.second_order['left_dist'],
-                                transition.second_order['right_dist']))
-                else:
-                    tqdm.write('{}:   {:.2f}     {:.2f}'.format(
-                                transition.label,
-                                transition.first_order['left_dist'],
-                                transition.first_order['right_dist']))
+    order_min, order_max = order[[0, -1]].to_value(u.angstrom)
+    in_order = np.nonzero((order_min < transition_wavelengths) &
+                          (transition_wavelengths < order_max))[0]
+    for index in in_order:
+        transition = transitions[index]
+        transition.orders_found_in.append(num + 1)
+        left_dist = wave2vel(transition.wavelength, order[0])
+        right_dist = wave2vel(transition.wavelength, order[-1])
+        if not hasattr(transition, 'first_order'):
+            transition.first_order = {}
+            transition.first_order['left_dist'] = left_dist.to(u.km/u.s)
+            transition.first_order['right_dist'] = right_dist.to(u.km/u.s)
+        elif hasattr(transition, 'first_order'):
+            transition.second_order = {}
+            transition.second_order['left_dist'] = left_dist.to(u.km/u.s)
+            transition.second_order['right_dist'] = right_dist.to(u.km/u.s)
+        if args.verbose:
+            if hasattr(transition, 'second_order'):
+                tqdm.write('{}:   {:.2f}     {:.2f}'.format(
+                            transition.label,
+                            transition.second_order['left_dist'],
+                            transition.second_order['right_dist']))
+            else:
+                tqdm.write('{}:   {:.2f}     {:.2f}'.format(
+                            transition.label,
+                            transition.first_order['left_dist'],
+                            transition.first_order['right_dist']))
 
 
 num_multi_order_transitions = 0
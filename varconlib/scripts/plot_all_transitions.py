@@ -54,10 +54,15 @@ obs = obs2d.HARPSFile2DScience(obs_path)
 radvel = obs.radialVelocity
 obs_file_name = obs._filename.stem
 
-for transition in tqdm(all_transitions):
-
-    corrected_wavelength = vcl.shift_wavelength(transition.wavelength, radvel)
-    order = obs.findWavelength(corrected_wavelength, obs.barycentricArray)
+# Find the orders for all the transitions at once.
+corrected_wavelengths = vcl.shift_wavelength(
+    u.unyt_array([transition.wavelength.to(u.angstrom).value
+                  for transition in all_transitions], u.angstrom), radvel)
+orders, _ = obs.findWavelengths(corrected_wavelengths, obs.barycentricArray)
+
+for transition, corrected_wavelength, order in zip(tqdm(all_transitions),
+                                                   corrected_wavelengths,
+                                                   orders):
 
     vel_wl_offset = vcl.velocity2wavelength(25 * u.km / u.s,
                                             corrected_wavelength)
@@ -15,11 +15,14 @@ import pickle
 import datetime
 from math import sqrt, isclose
 from fractions import Fraction
+from functools import partial
 from time import sleep
 from pathlib import Path
 
 import numpy as np
 import numpy.ma as ma
+from p_tqdm import p_map
+import pandas as pd
 from astroquery.nist import Nist
 from tqdm import tqdm
 import unyt as u
@@ -79,14 +82,11 @@ def save_and_format_selections(good_transitions, good_pairs):
 
     # Write out a list of the final selection of transitions in human-
     # readable format.
-    lines_to_write = [transition.formatInNistStyle() for transition in
-                      good_transitions]
-
     print(f'Writing out list of transition at {nist_best_formatted_file}')
     with open(nist_best_formatted_file, 'w') as f:
         f.write(header)
-        for write_str in lines_to_write:
-            f.write(write_str)
+        for transition in good_transitions:
+            f.write(transition.formatInNistStyle())
 
     # Write out a list of the final selection of pairs in a human-readable
     # format.
@@ -134,24 +134,89 @@ def line_is_masked(line, mask):
 
     Parameters
     ----------
-    line : float
-        The wavelength of the line to check, in nanometers.
+    line : float or array-like
+        The wavelength of the line to check, in nanometers. An array of
+        wavelengths can be given to check them all at once.
     mask : list
         A list of tuples, where each tuple is a two-tuple of floats denoting
         the start and end of a 'bad' spectral range to be avoided.
 
     Returns
     -------
-    bool
+    bool or `numpy.ndarray` of bools
         *True* if the line is within one of the masked regions, *False*
-        otherwise.
+        otherwise. If an array of wavelengths was given, an array of the same
+        shape is returned.
 
     """
 
-    for region in mask:
-        if region[0] < line < region[1]:
-            return True
-    return False
+    line = np.asarray(line, dtype=float)[..., np.newaxis]
+    starts = np.array([region[0] for region in mask], dtype=float)
+    ends = np.array([region[1] for region in mask], dtype=float)
+
+    return ((starts < line) & (line < ends)).any(axis=-1)
+
+
+def read_kurucz_line_list(kurucz_file, cache_file, col_widths, col_names,
+                          col_dtypes, usecols, skip_header, skip_footer):
+    """Read part of the Kurucz line list, or a cached copy of it if one exists.
+
+    Parsing the fixed-width Kurucz file is slow, so the first time it's read
+    the result is saved as a NumPy file which is simply loaded on subsequent
+    runs (as long as it's newer than the line list itself).
+
+    Parameters
+    ----------
+    kurucz_file : `pathlib.Path`
+        The path to the Kurucz line list.
+    cache_file : `pathlib.Path`
+        The path of the ``.npy`` file to save the parsed line list in, or to
+        load it from if it already exists.
+    col_widths : tuple of ints
+        The widths of the fixed-width columns in the file.
+    col_names : tuple of str
+        The names of all the columns in the file.
+    col_dtypes : tuple
+        The data types of all the columns in the file.
+    usecols : tuple of ints
+        The indices of the columns to read.
+    skip_header, skip_footer : int
+        The number of lines to skip at the beginning and end of the file.
+
+    Returns
+    -------
+    `numpy.ndarray`
+        A structured array with fields given by the names of the columns
+        read.
+
+    """
+
+    if cache_file.exists() and\
+            cache_file.stat().st_mtime >= kurucz_file.stat().st_mtime:
+        return np.load(cache_file, mmap_mode='r')
+
+    with open(kurucz_file, 'r') as f:
+        num_lines = sum(1 for line in f)
+
+    names = [col_names[i] for i in usecols]
+    dtypes = [col_dtypes[i] for i in usecols]
+    # String columns are read as-is, so that empty ones become empty strings
+    # rather than NaNs.
+    data = pd.read_fwf(kurucz_file, widths=col_widths, header=None,
+                       names=col_names, usecols=names,
+                       dtype={name: str for name, dtype in zip(names, dtypes)
+                              if dtype is not float},
+                       keep_default_na=False,
+                       skiprows=skip_header,
+                       nrows=num_lines - skip_header - skip_footer)
+
+    line_list = np.empty(len(data), dtype=list(zip(names, dtypes)))
+    for name in names:
+        line_list[name] = data[name].to_numpy()
+
+    np.save(cache_file, line_list)
+
+    return line_list
 
 
 def harmonize_lists(transitions1, transitions2, spectral_mask,
@@ -213,11 +278,39 @@ def harmonize_lists(transitions1, transitions2, spectral_mask,
     matched_one = []
     matched_mult = []
 
-    for line1 in tqdm(transitions1, unit='transitions'):
+    # Index the lines in the second list by ionic species so candidate
+    # matches can be found without looping over the entire list for each
+    # transition in the first one. For each species, store the wavelengths of
+    # its lines in sorted order (so those within the tolerance of a given
+    # wavelength can be found with a binary search) along with the indices of
+    # those lines in the list.
+    wavelengths2 = np.array([line2.wavelength.to(u.angstrom).value
+                             for line2 in transitions2])
+    species_index = {}
+    for index, line2 in enumerate(transitions2):
+        species_index.setdefault((line2.atomicNumber, line2.ionizationState),
+                                 []).append(index)
+    for species, indices in species_index.items():
+        indices = np.array(indices)
+        sort_order = np.argsort(wavelengths2[indices], kind='stable')
+        species_index[species] = (wavelengths2[indices][sort_order],
+                                  indices[sort_order])
+    no_lines = (np.empty(0), np.empty(0, dtype=int))
+
+    # Find which lines from the first list are in masked regions of the
+    # spectrum all at once.
+    masked_flags = line_is_masked([line1.wavelength.to(u.nm).value
+                                   for line1 in transitions1], spectral_mask)
+
+    # Only refresh the progress bar a few hundred times at most, rather than
+    # once per transition.
+    for line1, is_masked in zip(tqdm(transitions1, unit='transitions',
+                                     mininterval=0.5,
+                                     miniters=len(transitions1) // 200 or 1),
+                                masked_flags):
         # If the line is in a masked region of the spectrum, don't bother with
         # it, just pass.
-        if line_is_masked(float(line1.wavelength.to(u.nm).value),
-                          spectral_mask):
+        if is_masked:
             tqdm.write('{} is in a masked region.'.format(str(line1)))
             n_masked_lines += 1
             continue
@@ -242,46 +335,55 @@ def harmonize_lists(transitions1, transitions2, spectral_mask,
 
         # Set up a list to contain potential matched lines.
         matched_lines = []
-        # Set up a list to contain distance info for all lines of the same
-        # ionic species.
-        same_species_lines = []
 
-        # Go through lines in the second list and store any that match.
-        for line2 in transitions2:
-            if (line2.atomicNumber == line1.atomicNumber)\
-              and (line2.ionizationState == line1.ionizationState):
-
-                energy_diff = abs(line2.lowerEnergy - line1.lowerEnergy)
-                wavelength_diff = abs(line2.wavelength - line1.wavelength)
-                same_species_lines.append((line2, wavelength_diff,
-                                           energy_diff))
-
-                # If both line lists include higher energies for the orbitals,
-                # match those as well using the energy tolerance.
-                if (line1.higherEnergy is not None) and\
-                   (line2.higherEnergy is not None):
-                    energy_diff2 = abs(line2.higherEnergy -
-                                       line1.higherEnergy)
-                    if (energy_diff <= delta_energy) and\
-                       (energy_diff2 <= delta_energy) and\
-                       (wavelength_diff <= delta_wavelength):
-                        # Check if both lines have orbital momentum
-                        # information, and compare that too.
-                        if (line1.higherJ is not None) and\
-                           (line2.higherJ is not None) and\
-                           (line1.lowerJ is not None) and\
-                           (line2.lowerJ is not None):
-                            if (line1.lowerJ == line2.lowerJ) and\
-                               (line1.higherJ == line2.higherJ):
-                                matched_lines.append(line2)
-                        else:
+        # Check which optional information the line has once, rather than for
+        # every candidate line.
+        has_higher_energy = line1.higherEnergy is not None
+        has_J = (line1.higherJ is not None) and (line1.lowerJ is not None)
+
+        # Find the lines of the same ionic species in the second list within
+        # the wavelength tolerance. They are put back in their original order
+        # so that the choice between multiple matches below is unaffected by
+        # the sorting.
+        species_wavelengths, species_indices = species_index.get(
+            (line1.atomicNumber, line1.ionizationState), no_lines)
+        lower_index = np.searchsorted(species_wavelengths,
+                                      (line1.wavelength - delta_wavelength).
+                                      to(u.angstrom).value, side='left')
+        upper_index = np.searchsorted(species_wavelengths,
+                                      (line1.wavelength + delta_wavelength).
+                                      to(u.angstrom).value, side='right')
+
+        # Go through the candidate lines and store any that match.
+        for index in np.sort(species_indices[lower_index:upper_index]):
+            line2 = transitions2[index]
+
+            energy_diff = abs(line2.lowerEnergy - line1.lowerEnergy)
+            wavelength_diff = abs(line2.wavelength - line1.wavelength)
+
+            # If both line lists include higher energies for the orbitals,
+            # match those as well using the energy tolerance.
+            if has_higher_energy and (line2.higherEnergy is not None):
+                energy_diff2 = abs(line2.higherEnergy -
+                                   line1.higherEnergy)
+                if (energy_diff <= delta_energy) and\
+                   (energy_diff2 <= delta_energy) and\
+                   (wavelength_diff <= delta_wavelength):
+                    # Check if both lines have orbital momentum
+                    # information, and compare that too.
+                    if has_J and (line2.higherJ is not None) and\
+                       (line2.lowerJ is not None):
+                        if (line1.lowerJ == line2.lowerJ) and\
+                           (line1.higherJ == line2.higherJ):
                             matched_lines.append(line2)
-
-                else:
-                    if (energy_diff <= delta_energy) and\
-                       (wavelength_diff <= delta_wavelength):
+                    else:
                         matched_lines.append(line2)
 
+            else:
+                if (energy_diff <= delta_energy) and\
+                   (wavelength_diff <= delta_wavelength):
+                    matched_lines.append(line2)
+
         # If there's only one match (yay!) just save it.
         if len(matched_lines) == 1:
             if hasattr(line1, 'normalizedDepth'):
@@ -294,6 +396,16 @@ def harmonize_lists(transitions1, transitions2, spectral_mask,
             matched_zero.append((line1, delta_wavelength, delta_energy))
             tqdm.write('{} unmatched.'.format(str(line1)))
 
+            # Collect distance info for all lines of the same ionic species,
+            # to list the closest ones.
+            same_species_lines = []
+            for index in np.sort(species_indices):
+                line2 = transitions2[index]
+                energy_diff = abs(line2.lowerEnergy - line1.lowerEnergy)
+                wavelength_diff = abs(line2.wavelength - line1.wavelength)
+                same_species_lines.append((line2, wavelength_diff,
+                                           energy_diff))
+
             closest_lines = {}
             diff_scores = []
             for item in same_species_lines:
@@ -463,58 +575,185 @@ def find_line_pairs(transition_list, min_norm_depth=0.3, max_norm_depth=0.7,
                    'velocity separation = {}, depth diff = {}'.format(
                            velocity_separation, line_depth_difference))
 
-    for transition1 in tqdm(transition_list, unit='transitions'):
-        # Check that the transition falls within normalized depth limits.
-        if not(min_norm_depth <= transition1.normalizedDepth
-               <= max_norm_depth):
-            continue
+    # Sort the transitions by wavelength so that the ones within the velocity
+    # separation of each transition can be found with a binary search.
+    sorted_transitions = sorted(transition_list)
+    wavelengths = np.array([transition.wavelength.to(u.angstrom).value
+                            for transition in sorted_transitions])
+    depths = np.array([transition.normalizedDepth
+                       for transition in sorted_transitions])
+    # The wavelength separation corresponding to the velocity separation is
+    # proportional to wavelength, so find it for all transitions at once.
+    delta_wavelengths = wavelengths *\
+        float((velocity_separation / u.c).to(u.dimensionless).value)
+
+    first_indices, second_indices = find_pair_indices(wavelengths, depths,
+                                                      delta_wavelengths,
+                                                      min_norm_depth,
+                                                      max_norm_depth,
+                                                      line_depth_difference)
+
+    # The list may contain duplicate transitions, so map each transition to
+    # the index of the first one it's equal to. Since equal transitions have
+    # wavelengths within a relative tolerance of 1e-5, only the transitions
+    # just before each one need to be checked.
+    representatives = np.arange(len(sorted_transitions))
+    for index, transition in enumerate(sorted_transitions):
+        start = np.searchsorted(wavelengths, wavelengths[index] * (1 - 2e-5),
+                                side='left')
+        for other_index in range(start, index):
+            if sorted_transitions[other_index] == transition:
+                representatives[index] = representatives[other_index]
+                break
+
+    first_indices = representatives[first_indices]
+    second_indices = representatives[second_indices]
+
+    # Avoid matching a transition with itself.
+    distinct = first_indices != second_indices
+
+    # Each pair can be found from either of its transitions, so keep only one
+    # copy of each.
+    pair_indices = np.unique(np.stack((np.minimum(first_indices[distinct],
+                                                  second_indices[distinct]),
+                                       np.maximum(first_indices[distinct],
+                                                  second_indices[distinct])),
+                                      axis=1), axis=0)
+
+    for index1, index2 in tqdm(pair_indices, unit='pairs', mininterval=0.5,
+                               miniters=len(pair_indices) // 200 or 1):
+        # If a line makes it through all the checks, it's considered a
+        # match for the initial line. Create a TransitionPair object
+        # containing both of them.
+        transition_pair_list.append(TransitionPair(
+            sorted_transitions[index1], sorted_transitions[index2]))
+
+    return transition_pair_list
 
-        # If it's fine, figure out how much wavelength space to search around
-        # it based on the velocity separation.
-        delta_wl = vel2wave(velocity_separation, transition1.wavelength)
-        lowerLim = transition1.wavelength - delta_wl
-        upperLim = transition1.wavelength + delta_wl
 
-        # Iterate over the entire list of transitions.
-        for transition2 in transition_list:
+def find_pair_indices(wavelengths, depths, delta_wavelengths,
+                      min_norm_depth, max_norm_depth, line_depth_difference,
+                      chunk_size=10000):
+    """Find the indices of all pairs of transitions meeting given constraints.
 
-            # Avoid matching a transition with itself.
-            if transition1 == transition2:
-                continue
+    This works entirely on arrays of the transitions' properties, so the
+    candidate pairs can be found with vectorized operations instead of
+    comparing transitions one at a time.
 
-            # Check that the transition is within the velocity separation
-            # limits.
-            if not(lowerLim <= transition2.wavelength <= upperLim):
-                continue
+    Parameters
+    ----------
+    wavelengths : `numpy.ndarray`
+        An array of the wavelengths of the transitions, *in increasing order*.
+    depths : `numpy.ndarray`
+        An array of the normalized depths of the transitions, in the same order
+        as `wavelengths`.
+    delta_wavelengths : `numpy.ndarray`
+        An array of the wavelength separations to search around each
+        transition, in the same units and order as `wavelengths`.
+    min_norm_depth : float
+        The minimum normalized depth of a transition to consider.
+    max_norm_depth : float
+        The maximum normalized depth of a transition to consider.
+    line_depth_difference : float
+        The maximum difference in normalized depth between two transitions for
+        them to be considered a pair.
 
-            # Check that the transition falls within normalized depth limits.
-            if not(min_norm_depth <= transition2.normalizedDepth
-                   <= max_norm_depth):
-                continue
+    Optional
+    --------
+    chunk_size : int, Default : 10000
+        The number of transitions to find candidate pairs for at once. Each
+        chunk is independent of the others, so this limits the size of the
+        intermediate arrays created, and multiple chunks are searched in
+        parallel.
 
-            # Check that the two transitions' depths don't exceed the defined
-            # maximum depth difference.
-            if (abs(transition1.normalizedDepth -
-                    transition2.normalizedDepth) > line_depth_difference):
-                continue
+    Returns
+    -------
+    tuple of `numpy.ndarray`
+        Two arrays of ints of equal length; each element of the first is the
+        index of a transition, and the corresponding element of the second is
+        the index of a transition within its wavelength separation which
+        passes the depth constraints. Every pair found appears both ways round
+        if both transitions are within each other's wavelength separation.
 
-            # Only bother with transitions from the same element and ionization
-            # state.
-#            if (transition1.atomicNumber !=
-#                transition2.atomicNumber) or (transition1.ionizationState !=
-#                                              transition2.ionizationState):
-#                continue
-
-            # If a line makes it through all the checks, it's considered a
-            # match for the initial line. Create a TransitionPair object
-            # containing both of them and continue checking.
-            pair = TransitionPair(transition1, transition2)
-            if pair in transition_pair_list:
-                pass
-            else:
-                transition_pair_list.append(pair)
+    """
 
-    return transition_pair_list
+    lower_indices = np.searchsorted(wavelengths,
+                                    wavelengths - delta_wavelengths,
+                                    side='left')
+    upper_indices = np.searchsorted(wavelengths,
+                                    wavelengths + delta_wavelengths,
+                                    side='right')
+
+    # Only transitions within the normalized depth limits are considered.
+    in_depth_limits = (depths >= min_norm_depth) & (depths <= max_norm_depth)
+    all_anchors = np.nonzero(in_depth_limits)[0]
+
+    # The chunks are independent of each other, so search them in parallel
+    # when there's more than one.
+    chunk_search = partial(find_chunk_pair_indices,
+                           lower_indices=lower_indices,
+                           upper_indices=upper_indices,
+                           depths=depths,
+                           in_depth_limits=in_depth_limits,
+                           line_depth_difference=line_depth_difference)
+    chunks = [all_anchors[start:start + chunk_size]
+              for start in range(0, len(all_anchors), chunk_size)]
+    if len(chunks) > 1:
+        results = p_map(chunk_search, chunks)
+    else:
+        results = [chunk_search(chunk) for chunk in chunks]
+
+    first_chunks = [np.empty(0, dtype=int)]
+    second_chunks = [np.empty(0, dtype=int)]
+    for first_indices, second_indices in results:
+        first_chunks.append(first_indices)
+        second_chunks.append(second_indices)
+
+    return np.concatenate(first_chunks), np.concatenate(second_chunks)
+
+
+def find_chunk_pair_indices(anchors, lower_indices, upper_indices, depths,
+                            in_depth_limits, line_depth_difference):
+    """Find the candidate pairs for one chunk of transitions.
+
+    Parameters
+    ----------
+    anchors : `numpy.ndarray`
+        The indices of the transitions in this chunk.
+    lower_indices, upper_indices : `numpy.ndarray`
+        The indices bounding the range of transitions within the wavelength
+        separation of each transition, as found in `find_pair_indices`.
+    depths : `numpy.ndarray`
+        An array of the normalized depths of all the transitions.
+    in_depth_limits : `numpy.ndarray`
+        A boolean array of whether each transition is within the normalized
+        depth limits.
+    line_depth_difference : float
+        The maximum difference in normalized depth between two transitions for
+        them to be considered a pair.
+
+    Returns
+    -------
+    tuple of `numpy.ndarray`
+        The indices of the first and second transitions of each candidate pair
+        found for the transitions in `anchors`, as in `find_pair_indices`.
+
+    """
+
+    # Expand each transition into one entry per candidate transition within
+    # its wavelength separation.
+    counts = upper_indices[anchors] - lower_indices[anchors]
+    first_indices = np.repeat(anchors, counts)
+    offsets = np.arange(counts.sum()) -\
+        np.repeat(np.cumsum(counts) - counts, counts)
+    second_indices = np.repeat(lower_indices[anchors], counts) + offsets
+
+    mask = in_depth_limits[second_indices] &\
+        (np.abs(depths[first_indices] - depths[second_indices]) <=
+         line_depth_difference) &\
+        (first_indices != second_indices)
+
+    return first_indices[mask], second_indices[mask]
 
 
 def query_nist(transition_list, species_set):
@@ -710,9 +949,6 @@ if __name__ == '__main__':
 
     args = parser.parse_args()
 
-    global line_offsets
-    line_offsets = []
-
     data_dir = vcl.data_dir
     masks_dir = vcl.masks_dir
     pickle_dir = vcl.pickle_dir
@@ -739,6 +975,9 @@ if __name__ == '__main__':
                  float, float, float, "U4", int, int, int, float, int, float,
                  int, int, "U3", "U3", "U4", int, int, float)
 
+    # A cached copy of the part of the Kurucz line list that gets used.
+    kurucz_cache_file = pickle_dir / 'kurucz_line_list.npy'
+
     # Define various pickle files.
     # ----------------------------
 
@@ -783,66 +1022,86 @@ if __name__ == '__main__':
         tqdm.write("Read purple line list.")
 
         tqdm.write('Reading Kurucz line list...')
-        KuruczData = np.genfromtxt(KuruczFile, delimiter=colWidths,
-                                   autostrip=True,
-                                   skip_header=842959, skip_footer=987892,
-                                   names=colNames, dtype=colDtypes,
-                                   usecols=(0, 2, 3, 4, 5, 6, 7, 8, 18))
+        KuruczData = read_kurucz_line_list(KuruczFile, kurucz_cache_file,
+                                           colWidths, colNames, colDtypes,
+                                           usecols=(0, 2, 3, 4, 5, 6, 7, 8,
+                                                    18),
+                                           skip_header=842959,
+                                           skip_footer=987892)
         tqdm.write("Read Kurucz line list.")
 
+        # The factor to convert energies in eV to wavenumbers in cm^-1, so the
+        # lower energies can be converted with a simple multiplication rather
+        # than a unit conversion for every transition.
+        inv_cm_per_eV = float((1 * u.eV).to(u.cm ** -1,
+                                            equivalence='spectral').value)
+
+        # Split the line lists into separate arrays for each column, and do
+        # any conversions on whole columns at once, before creating the
+        # transitions.
+        b_wavelengths = purpleData['f0'].tolist()
+        symbols, symbol_indices = np.unique(purpleData['f1'],
+                                            return_inverse=True)
+        b_atomic_numbers = np.array([vcl.elements.inverse[symbol] for symbol
+                                     in symbols],
+                                    dtype=int)[symbol_indices].tolist()
+        b_ions = purpleData['f2'].tolist()
+        b_energies = (purpleData['f3'] * inv_cm_per_eV).tolist()
+        b_depths = purpleData['f5'].tolist()
+
         # Create lists of transitions from the BRASS and Kurucz line lists.
         b_transition_lines = []
         tqdm.write('Parsing BRASS line list...')
-        for b_transition in tqdm(purpleData, unit='transitions'):
-            wl = b_transition[0] * u.nm
-            elem = vcl.elements[b_transition[1]]
-            ion = b_transition[2]
-            eLow = b_transition[3] * u.eV
-            depth = b_transition[5]
-
-            transition = Transition(wl, elem, ion)
-            transition.lowerEnergy = 1/(eLow.to(u.cm, equivalence='spectral'))
+        for wl, elem, ion, eLow, depth in tqdm(zip(b_wavelengths,
+                                                   b_atomic_numbers,
+                                                   b_ions, b_energies,
+                                                   b_depths),
+                                               total=len(purpleData),
+                                               unit='transitions',
+                                               mininterval=0.5,
+                                               miniters=len(purpleData) //
+                                               200 or 1):
+            transition = Transition(wl * u.nm, elem, ion)
+            transition.lowerEnergy = eLow * u.cm ** -1
             transition.normalizedDepth = depth
 
             b_transition_lines.append(transition)
 
+        # The element and ionionzation state from the Kurucz list is given
+        # as a floating point number, e.g., 58.01, where the integer part
+        # is the atomic number and the charge is the hundredths part (which
+        # is off by one from astronomical usage, e.g. HI would have a
+        # hundredths part of '00', while FeII would be '01').
+        elem_parts = np.char.partition(KuruczData['elem'], '.')
+        k_atomic_numbers = elem_parts[:, 0].astype(int).tolist()
+        k_ions = (elem_parts[:, 2].astype(int) + 1).tolist()
+
+        # Either level may be the lower one in the Kurucz list.
+        first_is_lower = KuruczData['energy1'] < KuruczData['energy2']
+        k_levels = {}
+        for quantity in ('energy', 'J', 'label'):
+            k_levels['low' + quantity] = np.where(
+                first_is_lower, KuruczData[quantity + '1'],
+                KuruczData[quantity + '2']).tolist()
+            k_levels['high' + quantity] = np.where(
+                first_is_lower, KuruczData[quantity + '2'],
+                KuruczData[quantity + '1']).tolist()
+
         k_transition_lines = []
         tqdm.write('Parsing Kurucz line list...')
-        for k_transition in tqdm(KuruczData, unit='transitions'):
-            wl = k_transition['wavelength'] * u.nm
-            # The element and ionionzation state from the Kurucz list is given
-            # as a floating point number, e.g., 58.01, where the integer part
-            # is the atomic number and the charge is the hundredths part (which
-            # is off by one from astronomical usage, e.g. HI would have a
-            # hundredths part of '00', while FeII would be '01').
-            elem_str = k_transition['elem'].split('.')
-            elem_num = int(elem_str[0])
-            elem_ion = int(elem_str[1]) + 1
-            energy1 = k_transition['energy1']
-            energy2 = k_transition['energy2']
-            if energy1 < energy2:
-                lowE = k_transition['energy1'] * u.cm**-1
-                lowOrb = k_transition['label1']
-                lowJ = k_transition['J1']
-                highE = k_transition['energy2'] * u.cm**-1
-                highOrb = k_transition['label2']
-                highJ = k_transition['J2']
-            else:
-                lowE = k_transition['energy2'] * u.cm**-1
-                lowOrb = k_transition['label2']
-                lowJ = k_transition['J2']
-                highE = k_transition['energy1'] * u.cm**-1
-                highOrb = k_transition['label1']
-                highJ = k_transition['J1']
-            isotope_frac = k_transition['logIsotope']
-
-            transition = Transition(wl, elem_num, elem_ion)
-            transition.lowerEnergy = lowE
-            transition.lowerJ = lowJ
-            transition.lowerOrbital = lowOrb
-            transition.higherEnergy = highE
-            transition.higherJ = highJ
-            transition.higherOrbital = highOrb
+        for i, (wl, elem_num, elem_ion, isotope_frac) in enumerate(tqdm(
+                zip(KuruczData['wavelength'].tolist(), k_atomic_numbers,
+                    k_ions, KuruczData['logIsotope'].tolist()),
+                total=len(KuruczData), unit='transitions', mininterval=0.5,
+                miniters=len(KuruczData) // 200 or 1)):
+
+            transition = Transition(wl * u.nm, elem_num, elem_ion)
+            transition.lowerEnergy = k_levels['lowenergy'][i] * u.cm**-1
+            transition.lowerJ = k_levels['lowJ'][i]
+            transition.lowerOrbital = k_levels['lowlabel'][i]
+            transition.higherEnergy = k_levels['highenergy'][i] * u.cm**-1
+            transition.higherJ = k_levels['highJ'][i]
+            transition.higherOrbital = k_levels['highlabel'][i]
             transition.isotopeFraction = isotope_frac
 
             k_transition_lines.append(transition)
@@ -1005,11 +1264,10 @@ if __name__ == '__main__':
         header = header1 + header2 + header3 + header4 + header5
 
         all_nist_transitions.sort()
-        lines_to_write = [transition.formatInNistStyle() for transition in
-                          all_nist_transitions]
         with open(nist_formatted_file, 'w') as f:
             f.write(header)
-            for write_str in tqdm(lines_to_write):
+            for transition in tqdm(all_nist_transitions):
+                write_str = transition.formatInNistStyle()
                 write_str = write_str.replace('<', '[')
                 write_str = write_str.replace('>', ']')
                 f.write(write_str)
@@ -1020,11 +1278,10 @@ if __name__ == '__main__':
             all_transitions = pickle.load(f)
         tqdm.write(f'{len(all_transitions)} unique transitions found.')
 
-        lines_to_write = [transition.formatInNistStyle() for transition in
-                          all_transitions]
         with open(nist_formatted_all_file, 'w') as f:
             f.write(header)
-            for write_str in tqdm(lines_to_write):
+            for transition in tqdm(all_transitions):
+                write_str = transition.formatInNistStyle()
                 write_str = write_str.replace('<', '[')
                 write_str = write_str.replace('>', ']')
                 f.write(write_str)
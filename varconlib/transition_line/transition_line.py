@@ -22,6 +22,12 @@ from varconlib.exceptions import (AtomicNumberError,
 roman_numerals = bidict({1: 'I', 2: 'II', 3: 'III', 4: 'IV', 5: 'V',
                          6: 'VI', 7: 'VII', 8: 'VIII', 9: 'IX', 10: 'X'})
 
+# Plain dictionaries for the lookups done when creating a Transition, which
+# are faster than going through the bidicts (especially their inverses).
+_atomic_symbols = dict(vcl.elements)
+_atomic_numbers = dict(vcl.elements.inverse)
+_ionization_states = dict(roman_numerals.inverse)
+
 
 class Transition(object):
     """Class to hold information about a single atomic transition.
@@ -88,13 +94,12 @@ class Transition(object):
             else:
                 try:
                     self.atomicNumber = int(element)
-                    self.atomicSymbol = vcl.elements[self.atomicNumber]
+                    self.atomicSymbol = _atomic_symbols[self.atomicNumber]
                 # If not, see if it's a correct atomic symbol.
                 except ValueError:
                     cap_string = element.capitalize()
-                    try:
-                        self.atomicNumber = vcl.elements.inverse[cap_string]
-                    except KeyError:
+                    self.atomicNumber = _atomic_numbers.get(cap_string)
+                    if self.atomicNumber is None:
                         raise BadElementInputError('Given atomic symbol not '
                                                    'in elements dictionary!\n'
                                                    'Atomic symbol given '
@@ -106,7 +111,7 @@ class Transition(object):
                 raise AtomicNumberError('Element number not in '
                                         'range [1, 118]!')
             self.atomicNumber = element
-            self.atomicSymbol = vcl.elements[self.atomicNumber]
+            self.atomicSymbol = _atomic_symbols[self.atomicNumber]
 
         # Next check the given ionization state.
         try:
@@ -116,11 +121,10 @@ class Transition(object):
                                            ' >0.')
         except ValueError:
             # If it's a string, see if it's a Roman numeral.
-            try:
-                ionizationState = roman_numerals.inv[ionizationState]
-            except KeyError:
+            if ionizationState not in _ionization_states:
                 raise IonizationStateError('Ionization state "{}" '
                                            'invalid!'.format(ionizationState))
+            ionizationState = _ionization_states[ionizationState]
         self.ionizationState = ionizationState
 
         self.lowerEnergy = None
@@ -199,23 +203,19 @@ class Transition(object):
 
         """
 
-        str1 = '{:.3f} | {:.3f} | '.format(self.wavelength.
-                                           to(u.angstrom).value,
-                                           self.wavenumber.value)
-        str2 = '{:5} | '.format(self.atomicSpecies)
-        str3 = '{:9.3f} - {:9.3f} | '.format(self.lowerEnergy.value,
-                                             self.higherEnergy.value)
-        str4 = '{:35} | {!s:4} | '.format(self.lowerOrbital,
-                                          self.lowerJ)
-        str5 = '{:35} | {!s:4} | '.format(self.higherOrbital,
-                                          self.higherJ)
         if hasattr(self, 'blendedness'):
-            str6 = '{:0<5.3} | {} \n'.format(self.normalizedDepth,
-                                             self.blendedness)
+            blend_str = f'{self.blendedness} '
         else:
-            str6 = '{:0<5.3} | \n'.format(self.normalizedDepth)
-
-        return str1 + str2 + str3 + str4 + str5 + str6
+            blend_str = ''
+
+        return (f'{self.wavelength.to(u.angstrom).value:.3f} | '
+                f'{self.wavenumber.value:.3f} | '
+                f'{self.atomicSpecies:5} | '
+                f'{self.lowerEnergy.value:9.3f} - '
+                f'{self.higherEnergy.value:9.3f} | '
+                f'{self.lowerOrbital:35} | {self.lowerJ!s:4} | '
+                f'{self.higherOrbital:35} | {self.higherJ!s:4} | '
+                f'{self.normalizedDepth:0<5.3} | {blend_str}\n')
 
     def __repr__(self):
         """Return a representation of this instance."""